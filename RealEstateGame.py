@@ -2,54 +2,149 @@
 # GitHub username: boothcat
 # Description: Defines class RealEstateGame which represents the Real Estate Game with game players and game spaces.
 #              Defines methods for creating spaces, creating players, moving players around the circular board, buying
-#              properties, paying rent, and checking if the game has a winner.
+#              properties, paying rent, and checking if the game has a winner.  Boards are immutable BoardTemplates
+#              shared by all games with the same configuration.  Player state can be read in one call as a compact
+#              GameSnapshot.
 import random
 import time
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+from operator import itemgetter, methodcaller
+from types import MappingProxyType
+from dice import DiceStream
+from sinks import NullSink, PrintSink
+
+# Journal event codes.  Each journal record is (event, player number, space, amount).  See journal.py.
+MOVE = 1
+BUY = 2
+RENT = 3
+GO_BONUS = 4
+BANKRUPT = 5
+SET_BALANCE = 6
+SET_POSITION = 7
+
+# Turn outcome flags returned by move_many and play_round.  A turn with none of these flags moved the player to a
+# space with nothing to do.
+PASSED_GO = 1
+BOUGHT = 2
+PAID_RENT = 4
+BANKRUPTED = 8
+SKIPPED = 16                                                    # Player has zero balance and did not move
+
+# Smallest board: a roll of up to 6 never passes GO twice.
+MIN_SPACES = 6
+
+
+# Names and rents of the standard 25 space board.  Bigger boards use generated names and a stretched rent schedule.
+NAME_LIST = ("GO", "Dothraki Sea", "Meereen", "Quarth", "Volantis", "Braavos", "Iron Islands", "Dreadfort",
+             "Craster's Keep", "The Twins", "Eyrie", "Harrenhal", "Storm's End", "Oldtown", "Dragonstone",
+             "Sandstone", "Sunspear", "Castle Black", "Eastwatch", "Castamere", "Riverrun", "Highgarden",
+             "Casterly Rock", "Winterfell", "King's Landing")
+
+DEFAULT_RENTS = (50, 50, 50, 75, 75, 75, 100, 100, 100, 150, 150, 150, 200, 200, 200, 250, 250, 250, 300, 300, 300,
+                 350, 350, 350)
+
+
+@lru_cache(maxsize=16)
+def space_names(num_spaces):
+    """
+    Returns a tuple of names for a board with num_spaces spaces: the standard names, then "Space 25", "Space 26", ...
+    """
+    return NAME_LIST[:num_spaces] + tuple("Space " + str(index) for index in range(len(NAME_LIST), num_spaces))
+
+
+def default_rents(num_spaces=25):
+    """
+    Returns the default list of rents for spaces 1 to num_spaces - 1.  The standard rent schedule is stretched over
+    the board so that rents rise from 50 to 350 as on the standard board.
+    """
+    return [DEFAULT_RENTS[(index * len(DEFAULT_RENTS)) // (num_spaces - 1)] for index in range(num_spaces - 1)]
+
+
+# An immutable board: tuples of space names, purchase prices, and rents indexed by position, and the GO bonus.  The
+# GO space has purchase price False and rent None.  Games with the same configuration share one BoardTemplate.
+BoardTemplate = namedtuple("BoardTemplate", ["names", "prices", "rents", "bonus"])
+
+
+# Player state of a game in player order: tuples of names, positions, and balances, and a tuple of tuples of the
+# space numbers each player owns.
+GameSnapshot = namedtuple("GameSnapshot", ["names", "positions", "balances", "properties"])
+
+_position = itemgetter("Position")
+_balance = itemgetter("Balance")
+_properties = itemgetter("Properties")
+
+
+def snapshot_games(games):
+    """
+    Returns the list of GameSnapshots of the given games (RealEstateGames or CompactRealEstateGames), in order.
+    """
+    return list(map(methodcaller("snapshot"), games))
+
+
+@lru_cache(maxsize=64)
+def board_template(go_amount=100, rents=None, num_spaces=25):
+    """
+    Given the GO amount and a tuple of rents for the spaces after GO, returns the BoardTemplate for that board.  If
+    rents is None, the board has num_spaces spaces with the default rents.  The most recently used boards are cached,
+    so games with the same configuration share their template.  Raises ValueError if the board would have fewer than
+    MIN_SPACES spaces, since a turn moves up to 6 spaces and passes GO at most once.
+    """
+    if rents is None:
+        if num_spaces < MIN_SPACES:
+            raise ValueError("A board needs at least %d spaces." % MIN_SPACES)
+        rents = tuple(default_rents(num_spaces))
+    elif len(rents) < MIN_SPACES - 1:
+        raise ValueError("A board needs at least %d spaces." % MIN_SPACES)
+    rents = (None,) + rents
+    prices = (False,) + tuple(5 * rent for rent in rents[1:])
+    return BoardTemplate(space_names(len(rents)), prices, rents, go_amount)
 
 
 class RealEstateGame:
     """
     A class to represent the Real Estate Game with players and game spaces arranged around a circular game board.
     """
-    def __init__(self):
+    def __init__(self, verbose=True, sink=None):
         """
-        Creates a RealEstateGame object.  Initializes private data members spaces and players to empty dictionaries.
+        Creates a RealEstateGame object with no spaces and an empty dictionary of players.  Game messages are sent
+        to sink (see sinks.py).  If no sink is given, messages are printed, or discarded if verbose is False (used
+        for headless simulations).
         """
-        self._spaces = {}
+        self._board = None                                      # Shared BoardTemplate
+        self._owners = []                                       # Owner of each space: a name, None, or False (GO)
         self._players = {}
-
-    def create_spaces(self, go_amount=None, rent_list=None):
+        self._sink = None
+        self.set_sink(sink if sink is not None or not verbose else PrintSink())
+        self._solvent = set()                                   # Names of players with nonzero balances
+        self._owned_rent = {}                                   # Total rent of each player's properties
+        self._on_game_over = None
+        self._journal = None
+        self._checkpoints = []
+        self._num_spaces = 0
+
+    def create_spaces(self, go_amount=None, rent_list=None, num_spaces=None):
         """
         Given parameter go_amount, the amount of money earned when a player passes or lands on GO space, and parameter
-        rent_list, a list of rents for the other twenty-four spaces, create_spaces sets up the dictionary spaces which
-        represents 25 games spaces including the GO space.
+        rent_list, a list of rents for the other spaces, create_spaces sets up the game spaces including the GO space.
+        The board has one space more than rent_list.  If rent_list is not given, the board has num_spaces spaces
+        (default 25) with the default rents.  Spaces past the 25 named spaces are named "Space 25", "Space 26", ...
+        The board itself is a BoardTemplate shared with other games, and rent_list is not changed.  Raises ValueError
+        if the board would have fewer than 6 spaces.
         """
         if go_amount is None:
             go_amount = 100
 
         if rent_list is None:
-            rent_list = [50, 50, 50, 75, 75, 75, 100, 100, 100, 150, 150, 150, 200, 200, 200, 250, 250, 250, 300, 300,
-                         300, 350, 350, 350]
-
-        # Add GO amount to beginning of rent_list
-        rent_list.insert(0, go_amount)
-
-        # Set unique names for all spaces
-        name_list = ["GO", "Dothraki Sea", "Meereen", "Quarth", "Volantis", "Braavos", "Iron Islands", "Dreadfort",
-                     "Craster's Keep", "The Twins", "Eyrie", "Harrenhal", "Storm's End", "Oldtown", "Dragonstone",
-                     "Sandstone", "Sunspear", "Castle Black", "Eastwatch", "Castamere", "Riverrun", "Highgarden",
-                     "Casterly Rock", "Winterfell", "King's Landing"]
-
-        # Set up spaces dictionary. Keywords are space positions 0-24 and values are dictionaries of space information.
-        for index in range(len(rent_list)):
-            if index == 0:
-                # GO space cannot be purchased and does not have an owner.  GO bonus is set to go_amount.
-                self._spaces[index] = {"Name": name_list[index], "Purchase": False, "Bonus": go_amount, "Owner": False}
-            else:
-                # Spaces 1-24 have names, purchase prices, and rents from corresponding name_list and rent_list.
-                # Owner is initialized to None.
-                self._spaces[index] = {"Name": name_list[index], "Purchase": 5 * rent_list[index],
-                                       "Rent": rent_list[index], "Owner": None}
+            self._board = board_template(go_amount, None, 25 if num_spaces is None else num_spaces)
+        else:
+            self._board = board_template(go_amount, tuple(rent_list))
+
+        # GO space cannot be purchased and does not have an owner.  Other spaces start with owner None.
+        self._num_spaces = len(self._board.names)
+        self._owners = [None] * self._num_spaces
+        self._owners[0] = False
         return
 
     def create_player(self, name, starting_balance=None):
@@ -69,6 +164,9 @@ class RealEstateGame:
         # Set up player dictionary. Keyword is player's name. Value is dictionary of player game information.
         # Player starts game at GO with starting_balance and an empty list of properties.
         self._players[name] = {"Position": 0, "Balance": starting_balance, "Properties": []}
+        self._owned_rent[name] = 0
+        if starting_balance != 0:
+            self._solvent.add(name)
         return True
 
     def get_player_account_balance(self, name):
@@ -81,7 +179,8 @@ class RealEstateGame:
 
     def get_player_current_position(self, name):
         """
-        Returns the given player's current position as an integer [0-24] where O represents the GO space.
+        Returns the given player's current position as an integer from 0 to the number of spaces - 1, where 0
+        represents the GO space.
         Returns 'Invalid player' if player's name does not exist.
         """
         if name not in self._players:                           # Check that player name exists.
@@ -90,44 +189,201 @@ class RealEstateGame:
 
     def get_players(self):
         """
-        Returns the player dictionary which contains all player information: name, account balance, position, and
-        properties owned.
+        Returns a read-only view of the player dictionary which contains all player information: name, account
+        balance, position, and properties owned.  The view is not a copy, so it always shows the current state.  The
+        player dictionaries inside are the game's own and must not be changed.
+        """
+        return MappingProxyType(self._players)
+
+    def snapshot(self):
+        """
+        Returns a GameSnapshot of every player's name, position, balance, and properties in one call.  The snapshot
+        is made of tuples, so it does not change as the game goes on.
         """
-        return self._players
+        infos = self._players.values()
+        return GameSnapshot(tuple(self._players), tuple(map(_position, infos)), tuple(map(_balance, infos)),
+                            tuple(map(tuple, map(_properties, infos))))
 
     def get_spaces(self):
         """
-        Returns the spaces dictionary which contains all space information: name, purchase amount, rent, and owner.
+        Returns a new spaces dictionary which contains all space information: name, purchase amount, rent, and owner.
+        Keywords are space positions.  The GO space has a GO bonus instead of a rent.  Returns an empty dictionary if
+        create_spaces has not been called.
+        """
+        board = self._board
+        if board is None:
+            return {}
+        spaces = {0: {"Name": board.names[0], "Purchase": False, "Bonus": board.bonus, "Owner": False}}
+        for position in range(1, self._num_spaces):
+            spaces[position] = {"Name": board.names[position], "Purchase": board.prices[position],
+                                "Rent": board.rents[position], "Owner": self._owners[position]}
+        return spaces
+
+    def get_owners(self):
+        """
+        Returns the list of space owners indexed by position: a player's name, None if the space has no owner, or False
+        for the GO space.  The list is the game's own list and must not be changed.
+        """
+        return self._owners
+
+    def get_board(self):
+        """Returns the game's BoardTemplate."""
+        return self._board
+
+    def get_state(self):
+        """
+        Returns the game state as a dictionary of lists and numbers that can be saved as JSON: the GO amount, the list
+        of rents for the other spaces, and a list of [name, position, balance, properties] for each player.
+        """
+        return {"GO": self._board.bonus,
+                "Rents": list(self._board.rents[1:]),
+                "Players": [[name, info["Position"], info["Balance"], list(info["Properties"])]
+                            for name, info in self._players.items()]}
+
+    def set_state(self, state):
         """
-        return self._spaces
+        Given a state dictionary returned by get_state, sets up the spaces and players of this game to match it.
+        """
+        self._players = {}
+        self._solvent = set()
+        self._owned_rent = {}
+        self._checkpoints = []
+        self.create_spaces(state["GO"], state["Rents"])
+        for name, position, balance, properties in state["Players"]:
+            self.create_player(name, balance)
+            self._players[name]["Position"] = position
+            for space in properties:
+                self._owners[space] = name
+                self._players[name]["Properties"].append(space)
+                self._owned_rent[name] += self._board.rents[space]
+
+    def clone(self):
+        """
+        Returns an independent copy of the game for lookahead search.  The copy is silent and has no game over
+        callback or journal.
+        """
+        game = RealEstateGame.__new__(RealEstateGame)
+        game._board = self._board
+        game._owners = self._owners[:]
+        game._players = {name: {"Position": info["Position"], "Balance": info["Balance"],
+                                "Properties": info["Properties"][:]}
+                         for name, info in self._players.items()}
+        game._sink = None
+        game._solvent = self._solvent.copy()
+        game._owned_rent = self._owned_rent.copy()
+        game._on_game_over = None
+        game._journal = None
+        game._checkpoints = []
+        game._num_spaces = self._num_spaces
+        return game
+
+    def checkpoint(self):
+        """
+        Saves the positions, balances, and properties of all players so that rollback can undo later moves and
+        purchases in place.  Checkpoints can be nested.  Returns the number of saved checkpoints.
+        """
+        self._checkpoints.append(([(info, info["Position"], info["Balance"], info["Properties"][:])
+                                   for info in self._players.values()],
+                                  self._owners[:],
+                                  self._solvent.copy(), self._owned_rent.copy()))
+        return len(self._checkpoints)
+
+    def rollback(self):
+        """
+        Restores the game to the most recent checkpoint and removes that checkpoint.  Does not undo journal records,
+        so journaled games should be searched with clone instead.
+        """
+        players, owners, self._solvent, self._owned_rent = self._checkpoints.pop()
+        for info, position, balance, properties in players:
+            info["Position"] = position
+            info["Balance"] = balance
+            info["Properties"][:] = properties
+        self._owners[:] = owners
+
+    def commit(self):
+        """Removes the most recent checkpoint without restoring it."""
+        self._checkpoints.pop()
+
+    def set_journal(self, journal):
+        """
+        Given a journal object (see journal.GameJournal), records every move, purchase, rent payment, GO bonus,
+        bankruptcy, and set_balance or set_position call in the journal.  None stops recording.
+        """
+        self._journal = journal
+        if journal is not None:
+            journal.start(self)
 
     def get_spaces_name(self, position):
         """Returns the name of the given space"""
-        return self._spaces[position]["Name"]
+        return self._board.names[position]
 
     def get_properties(self, player):
         """Returns all the properties for the given player name"""
         return self._players[player]["Properties"]
 
+    def get_property_count(self, name):
+        """Returns the number of properties owned by the given player name"""
+        return len(self._players[name]["Properties"])
+
+    def get_total_rent(self, name):
+        """Returns the total rent of all the properties owned by the given player name"""
+        return self._owned_rent[name]
+
+    def owns(self, name, position):
+        """Returns True if the given player name owns the given space"""
+        return self._owners[position] == name
+
     def get_rent(self, position):
         """Returns the rent price for the given space"""
-        return self._spaces[position]["Rent"]
+        return self._board.rents[position]
 
     def get_purchase_price(self, position):
         """Returns purchase price for the given position"""
-        return self._spaces[position]["Purchase"]
+        return self._board.prices[position]
 
     def get_owner(self, position):
         """Returns owner of space"""
-        return self._spaces[position]["Owner"]
+        return self._owners[position]
 
     def set_position(self, name, position):
-        """For testing purposes, sets a player's position on designated space 0-24"""
+        """For testing purposes, sets a player's position on designated space"""
         self._players[name]["Position"] = position
+        if self._journal is not None:
+            self._journal.records.extend((SET_POSITION, self._journal.ids[name], position, 0))
 
     def set_balance(self, name, balance):
         """For testing purposes, sets a player's balance to designated amount"""
         self._players[name]["Balance"] = balance
+        self._update_solvent(name)
+        if self._journal is not None:
+            self._journal.records.extend((SET_BALANCE, self._journal.ids[name], 0, balance))
+
+    def set_sink(self, sink):
+        """
+        Sets the sink that receives game messages.  None or a NullSink discards messages without any cost.
+        """
+        self._sink = None if sink is None or isinstance(sink, NullSink) else sink
+
+    def set_game_over_callback(self, callback):
+        """
+        Sets a function to be called with the winning player's name as soon as all but one player have zero balances,
+        so that game loops do not need to call check_game_over.  None removes the callback.
+        """
+        self._on_game_over = callback
+
+    def _update_solvent(self, name):
+        """
+        Updates the set of players with nonzero balances after the given player's balance has changed, and calls the
+        game over callback if the change ended the game.
+        """
+        was_over = len(self._solvent) == 1
+        if self._players[name]["Balance"] == 0:
+            self._solvent.discard(name)
+        else:
+            self._solvent.add(name)
+
+        if len(self._solvent) == 1 and not was_over and self._on_game_over is not None:
+            self._on_game_over(next(iter(self._solvent)))
 
     def buy_space(self, name):
         """
@@ -144,17 +400,21 @@ class RealEstateGame:
         space = self.get_player_current_position(name)
 
         # Check that the space is not owned by another player or GO space.
-        if self._spaces[space]["Owner"] is None:
+        if self._owners[space] is None:
 
             # Check that the player's balance is greater than the purchase price
-            if self._players[name]["Balance"] > self._spaces[space]["Purchase"]:
+            price = self._board.prices[space]
+            if self._players[name]["Balance"] > price:
 
-                # Update the space's owner in the spaces dictionary
-                self._spaces[space]["Owner"] = name
+                # Update the space's owner in the owners list
+                self._owners[space] = name
                 # Deduct the purchase price from the player's account balance.
-                self._players[name]["Balance"] -= self._spaces[space]["Purchase"]
+                self._players[name]["Balance"] -= price
                 # Add the space to the list of the player's properties
                 self._players[name]["Properties"].append(space)
+                self._owned_rent[name] += self._board.rents[space]
+                if self._journal is not None:
+                    self._journal.records.extend((BUY, self._journal.ids[name], space, price))
                 return True
             return False
         return False
@@ -166,16 +426,22 @@ class RealEstateGame:
         is less than or equal to the rent payment, pay_rent calls declare_bankruptcy method.
         """
         # Check if the player's balance is less than or equal to the rent.
-        if self._players[name]["Balance"] <= self._spaces[position]["Rent"]:
+        if self._players[name]["Balance"] <= self._board.rents[position]:
             # Call declare_bankruptcy method
-            print("Oh no!  You must declare bankruptcy and forfeit all property")
+            if self._sink is not None:
+                self._sink.emit("bankruptcy", "Oh no!  You must declare bankruptcy and forfeit all property",
+                                name=name, owner=owner, amount=self._players[name]["Balance"])
             self.declare_bankruptcy(name, owner)
             return
 
         # Player pays rent to the space owner
-        payment = self._spaces[position]["Rent"]
+        payment = self._board.rents[position]
         self._players[name]["Balance"] -= payment
         self._players[owner]["Balance"] += payment
+        if self._journal is not None:
+            self._journal.records.extend((RENT, self._journal.ids[name], position, payment))
+        if owner not in self._solvent:                          # Owner's balance may have been zero
+            self._update_solvent(owner)
         return
 
     def declare_bankruptcy(self, name, owner):
@@ -187,11 +453,18 @@ class RealEstateGame:
         payment = self._players[name]["Balance"]
         self._players[owner]["Balance"] += payment              # Pay owner player's balance.
         self._players[name]["Balance"] = 0                      # Set player balance to zero.
-
-        # Remove all properties from player's property list
-        for item in list(self._players[name]["Properties"]):
-            self._players[name]["Properties"].remove(item)
-            self._spaces[item]["Owner"] = None                  # Set space's owner back to None
+        if self._journal is not None:
+            # The space field of a bankruptcy record holds the player number of the owner who was paid.
+            self._journal.records.extend((BANKRUPT, self._journal.ids[name], self._journal.ids[owner], payment))
+        self._update_solvent(owner)
+        self._update_solvent(name)
+
+        # Set each property's owner back to None, then empty the player's property list all at once.
+        properties = self._players[name]["Properties"]
+        for item in properties:
+            self._owners[item] = None
+        properties.clear()
+        self._owned_rent[name] = 0
         return
 
     def move_player(self, name, number):
@@ -212,22 +485,36 @@ class RealEstateGame:
 
         # If the player has zero balance, the player has lost the game and cannot move.
         if self._players[name]["Balance"] == 0:
-            print("Zero balance. :(  Next player's turn!")
+            if self._sink is not None:
+                self._sink.emit("zero_balance", "Zero balance. :(  Next player's turn!", name=name)
             return
 
         # Player's previous position on the board before moving
         past_position = self._players[name]["Position"]
+        journal = self._journal
+        if journal is not None:
+            # Flush before recording the move so that snapshots fall between turns.
+            if len(journal.records) >= journal.limit:
+                journal.flush()
+            journal.records.extend((MOVE, journal.ids[name], past_position, number))
 
         # Check if the player will land on or pass "GO."
-        if past_position + number > 24:
+        position = past_position + number
+        if position >= self._num_spaces:
             # Player earns GO bonus
-            self._players[name]["Balance"] += self._spaces[0]["Bonus"]
-            print("Go Bonus: $50!")
+            bonus = self._board.bonus
+            self._players[name]["Balance"] += bonus
+            if journal is not None:
+                journal.records.extend((GO_BONUS, journal.ids[name], 0, bonus))
+            if self._sink is not None:
+                self._sink.emit("go_bonus", "Go Bonus: $" + str(bonus) + "!", name=name, amount=bonus)
+            if self._players[name]["Balance"] == 0:             # Only possible if the balance was negative
+                self._update_solvent(name)
             # Reset position numbering at 0 for GO space and set player's current position
-            self._players[name]["Position"] = (past_position - 24) + (number - 1)
+            self._players[name]["Position"] = position - self._num_spaces
         else:
             # Set player's current position
-            self._players[name]["Position"] += number
+            self._players[name]["Position"] = position
 
         # Player's current position on the board after moving
         current_position = self.get_player_current_position(name)
@@ -238,22 +525,133 @@ class RealEstateGame:
             self.pay_rent(name, current_position, owner)
         return
 
-    def check_game_over(self):
+    def move_many(self, name, rolls, policy=None):
         """
-        Returns the winning player's name if all but one player have zero balances.  Otherwise, returns an empty string.
+        Given the player's name, a list of dice rolls [1-6], and a buy policy, move_many plays one turn of the player
+        for each roll and returns an array of turn outcome flags, one per roll (see PASSED_GO, BOUGHT, PAID_RENT,
+        BANKRUPTED, and SKIPPED).  policy is either a function called as policy(game, name, position) when the player
+        lands on an unowned space, or a list of True/False purchase decisions, one per roll.  None never buys.
+        Returns 'Invalid move.' or 'Invalid player.' like move_player, before any turn is played.
         """
-        # Initialize count of players with zero balances to 0.
-        zero_counter = 0
-        for player in self._players:
-            # Check if player has zero balance
-            if self._players[player]["Balance"] == 0:
-                zero_counter += 1                               # Increment zero counter
-            else:
-                name = player                                   # Keep track of name of nonzero balance player
+        for number in rolls:
+            if number < 1 or number > 6:
+                return "Invalid move."
+        if name not in self._players:
+            return "Invalid player."
+        outcomes = array("b")
+        self._play_turns([name] * len(rolls), rolls, policy, outcomes)
+        return outcomes
+
+    def play_round(self, rolls, policy=None):
+        """
+        Given a list of dice rolls [1-6], one per player in the order players were created, and a buy policy, plays
+        one round and returns an array of turn outcome flags, one per player.  Players with zero balance are
+        SKIPPED.  policy is a function, a list of purchase decisions (one per player), or None as for move_many.
+        Returns 'Invalid move.' if a roll is not 1-6 or there is not one roll per player.
+        """
+        if len(rolls) != len(self._players):
+            return "Invalid move."
+        for number in rolls:
+            if number < 1 or number > 6:
+                return "Invalid move."
+        outcomes = array("b")
+        self._play_turns(self._players, rolls, policy, outcomes)
+        return outcomes
+
+    def _play_turns(self, names, rolls, policy, outcomes):
+        """
+        Helper method for move_many and play_round.  Plays one turn for each name (a list of names or the players
+        dictionary) and roll and appends the turn outcome flags to outcomes.  The names and rolls have already been
+        checked.  Games with a sink, a journal, or instrumentation (methods replaced on the game object) play each
+        turn through the public methods so that every message and record is kept.
+        """
+        by_index = policy is not None and not callable(policy)
+        decide = policy.__getitem__ if by_index else policy
+        if self._sink is not None or self._journal is not None or "move_player" in self.__dict__:
+            for index, name in enumerate(names):
+                outcomes.append(self._play_public_turn(name, rolls[index], decide, index if by_index else None))
+            return
+
+        # Local names for the tight loop
+        players = self._players
+        owners = self._owners
+        board = self._board
+        num_spaces = self._num_spaces
+        append = outcomes.append
+        index = -1
+        for name in names:
+            index += 1
+            info = players[name]
+            balance = info["Balance"]
+            if balance == 0:
+                append(SKIPPED)
+                continue
+
+            outcome = 0
+            position = info["Position"] + rolls[index]
+            if position >= num_spaces:
+                position -= num_spaces
+                balance += board.bonus
+                info["Balance"] = balance
+                outcome = PASSED_GO
+                if balance == 0:                                # Only possible if the balance was negative
+                    self._update_solvent(name)
+            info["Position"] = position
+
+            owner = owners[position]
+            if owner is None:
+                if decide is not None and (decide(index) if by_index else decide(self, name, position)) and \
+                        balance > board.prices[position]:
+                    owners[position] = name
+                    info["Balance"] = balance - board.prices[position]
+                    info["Properties"].append(position)
+                    self._owned_rent[name] += board.rents[position]
+                    outcome |= BOUGHT
+            elif owner is not False and owner != name:
+                rent = board.rents[position]
+                if balance <= rent:
+                    self.declare_bankruptcy(name, owner)
+                    outcome |= BANKRUPTED
+                else:
+                    info["Balance"] = balance - rent
+                    players[owner]["Balance"] += rent
+                    if owner not in self._solvent:
+                        self._update_solvent(owner)
+                    outcome |= PAID_RENT
+            append(outcome)
+
+    def _play_public_turn(self, name, number, decide, index):
+        """
+        Helper method for _play_turns.  Plays one turn with move_player and buy_space and returns its outcome flags.
+        decide is called with index if index is not None, otherwise with (game, name, position).
+        """
+        info = self._players[name]
+        if info["Balance"] == 0:
+            self.move_player(name, number)                      # Sends the zero balance message
+            return SKIPPED
+
+        outcome = PASSED_GO if info["Position"] + number >= self._num_spaces else 0
+        self.move_player(name, number)
+        position = info["Position"]
+        owner = self._owners[position]
+        if owner is None:
+            if decide is not None and (decide(index) if index is not None else decide(self, name, position)) and \
+                    self.buy_space(name) is True:
+                outcome |= BOUGHT
+        elif owner is not False and owner != name:
+            # The rent payment leaves a positive balance unless it bankrupted the player.  A negative balance
+            # brought to zero by the GO bonus is not a bankruptcy.
+            outcome |= BANKRUPTED if info["Balance"] == 0 else PAID_RENT
+        return outcome
 
+    def check_game_over(self):
+        """
+        Returns the winning player's name if all but one player have zero balances.  Otherwise, returns False.
+        The set of players with nonzero balances is kept up to date as balances change, so this takes constant time.
+        """
         # If all but one player have zero balance, game is over.
-        if zero_counter == len(self._players) - 1:
-            return name
+        if len(self._solvent) == 1:
+            return next(iter(self._solvent))
         else:
             return False
 
@@ -262,10 +660,12 @@ if __name__ == '__main__':
     # Create game and set up spaces with rents and go space amount
     game = RealEstateGame()
     game.create_spaces()
+    dice_stream = DiceStream()
 
     # Print instructions
     print("Claim your land or pay the rent! There are 24 properties waiting to be bought!")
-    print("All players start with $1000. There is a $50 bonus for passing the 'Go' space")
+    print("All players start with $1000. There is a $" + str(game.get_board().bonus) +
+          " bonus for passing the 'Go' space")
     print("Last player with nonzero balance wins!\n")
 
     # Get number of players and validate user input
@@ -291,9 +691,11 @@ if __name__ == '__main__':
         else:
             i += 1
 
-    # Add a random computer opponent
+    # Add a random computer opponent.  The computer decides purchases with a Monte Carlo search.
     computer = input("Would you like to add the computer as an opponent? Y or N: ")
     if computer == "Y" or computer == "y":
+        from ai import MonteCarloPlayer
+        computer_player = MonteCarloPlayer(time_budget=0.05)
         opponents = ["Circe Lannister", "Khal Drogo", "Jon Snow"]
         player_names.append(opponents[random.randint(0, len(opponents)-1)])
         game.create_player(player_names[-1])
@@ -309,7 +711,7 @@ if __name__ == '__main__':
 
         # Move players, check if property is available for purchase, or pay rent
         for i in range(num_players):
-            dice = random.randint(1, 6)
+            dice = dice_stream.roll()
             name = player_names[i]
             print("Rolling dice for " + name + "...")
             time.sleep(1)
@@ -334,7 +736,7 @@ if __name__ == '__main__':
 
         # Computer's turn
         if computer == "Y" or computer == "y":
-            dice = random.randint(1, 6)
+            dice = dice_stream.roll()
             name = player_names[-1]
             print("Rolling dice for " + name + "...")
             time.sleep(1)
@@ -344,8 +746,10 @@ if __name__ == '__main__':
 
             # Buy property or pay rent
             if game.get_owner(position) is None:
-                if not game.buy_space(name):
+                if game.get_player_account_balance(name) <= game.get_purchase_price(position):
                     print("Curses! " + player_names[-1] + " cannot afford this property!")
+                elif not computer_player(game, name, position) or not game.buy_space(name):
+                    print(player_names[-1] + " decided not to buy this property.")
                 elif game.get_owner(position) is not False and game.get_owner(position) != player_names[-1]:
                     print(player_names[-1] + " must pay $" + str(game.get_rent(position)) + " to " + game.get_owner(position) + "!")
                 else:
@@ -355,13 +759,11 @@ if __name__ == '__main__':
 
         # Show end of round stats: player position, balance, and properties
         print("Round " + str(round) + " stats: ")
-        for i in range(len(player_names)):
-            print(player_names[i] + "'s " + "position = ", game.get_player_current_position(player_names[i]))
-            print(player_names[i] + "'s " + "balance = ", game.get_player_account_balance(player_names[i]))
-            property_list = []
-            for space in game.get_properties(player_names[i]):
-                property_list.append(game.get_spaces_name(space))
-            print(player_names[i] + "'s " + "properties = ", property_list)
+        board_names = game.get_board().names
+        for name, position, balance, properties in zip(*game.snapshot()):
+            print(name + "'s " + "position = ", position)
+            print(name + "'s " + "balance = ", balance)
+            print(name + "'s " + "properties = ", [board_names[space] for space in properties])
             time.sleep(1)
             print('\n')
 
@@ -1,5 +1,37 @@
+import asyncio
+import io
+import json
+import os
+import pickle
+import random
+import tempfile
 import unittest
-from RealEstateGame import RealEstateGame
+from contextlib import redirect_stdout
+from RealEstateGame import RealEstateGame, board_template, snapshot_games, PASSED_GO, BOUGHT, PAID_RENT, BANKRUPTED, \
+    SKIPPED
+from compact_game import CompactRealEstateGame, measure_memory_per_game
+from simulation import simulate_game, never_buy, always_buy, ThresholdPolicy, WINNER, ROUND_CAP
+from tournament import run_tournament, replay_game, game_seed
+from analytics import analyze_board, stationary_distribution, transition_matrix
+from journal import GameJournal, replay, read_events
+from ai import MonteCarloPlayer
+from sinks import NullSink, BufferedSink, JsonlSink
+from server import GameServer
+from benchmarks import run_benchmarks, compare
+from instrumentation import Instrumentation
+from dice import DiceStream, NumpyDice, RecordedDice
+from optimizer import optimize_policy, grid_search, threshold_grid, play_candidate
+from results_store import ResultsWriter, ResultsReader, write_simulations, HEADER
+from solver import ExpectimaxSolver
+from sweep import Sweep, sweep_configs, run_worker, run_sweep, manifest_spec, policy_name, policy_from_name
+from stalemate import StalemateDetector, STABLE, FROZEN, STALLED
+from differential import run_differential, random_case, check_case, shrink, trace_game
+
+try:
+    import numpy
+    from batch_engine import BatchGame
+except ImportError:                                       # NumPy is optional and only needed for the batch engine
+    numpy = None
 
 
 class TestGame(unittest.TestCase):
@@ -274,5 +306,1195 @@ class TestGame(unittest.TestCase):
         """check_game_over returns False if more than one player has nonzero balance."""
         self.assertEqual(self.game.check_game_over(), False)
 
+    def test39(self):
+        """Game over callback is called with the winner's name when a player goes bankrupt."""
+        winners = []
+        self.game.set_game_over_callback(winners.append)
+        self.game.set_balance("Player 2", 75)
+        self.game.move_player("Player 1", 6)
+        self.game.buy_space("Player 1")
+        self.game.move_player("Player 2", 6)
+        self.assertEqual(winners, ["Player 1"])
+        self.assertEqual(self.game.check_game_over(), "Player 1")
+
+    def test40(self):
+        """A player with zero balance who is paid rent is back in the game."""
+        self.game.create_player("Player 3", 1000)
+        self.game.move_player("Player 1", 6)
+        self.game.buy_space("Player 1")
+        self.game.set_balance("Player 1", 0)
+        self.game.set_balance("Player 3", 0)
+        self.assertEqual(self.game.check_game_over(), "Player 2")
+        self.game.move_player("Player 2", 6)
+        self.assertEqual(self.game.check_game_over(), False)
+
+    def test41(self):
+        """Player buys spaces 6 and 9.  Property count, total rent, and ownership are updated."""
+        self.game.move_player("Player 1", 6)
+        self.game.buy_space("Player 1")
+        self.game.move_player("Player 1", 3)
+        self.game.buy_space("Player 1")
+        self.assertEqual(self.game.get_property_count("Player 1"), 2)
+        self.assertEqual(self.game.get_total_rent("Player 1"), 175)
+        self.assertEqual(self.game.owns("Player 1", 9), True)
+        self.assertEqual(self.game.owns("Player 2", 9), False)
+
+    def test42(self):
+        """Player 2 loses the game.  Property count and total rent are reset and spaces can be bought again."""
+        self.game.set_balance("Player 2", 300)
+        self.game.move_player("Player 1", 6)
+        self.game.buy_space("Player 1")
+        self.game.move_player("Player 2", 3)
+        self.game.buy_space("Player 2")
+        self.game.move_player("Player 2", 3)
+        self.assertEqual(self.game.get_property_count("Player 2"), 0)
+        self.assertEqual(self.game.get_total_rent("Player 2"), 0)
+        self.assertEqual(self.game.owns("Player 2", 3), False)
+
+    def test43(self):
+        """A board of 100,000 spaces has generated names and rents rising from 50 to 350."""
+        game = type(self.game)(verbose=False)
+        game.create_spaces(num_spaces=100000)
+        self.assertEqual(len(game.get_spaces()), 100000)
+        self.assertEqual(game.get_spaces_name(24), "King's Landing")
+        self.assertEqual(game.get_spaces_name(99999), "Space 99999")
+        self.assertEqual((game.get_rent(1), game.get_rent(99999)), (50, 350))
+
+    def test44(self):
+        """On a 1000 space board, the player wraps around and earns the GO bonus after space 999."""
+        game = type(self.game)(verbose=False)
+        game.create_spaces(num_spaces=1000)
+        game.create_player("Player 1", 1000)
+        game.set_position("Player 1", 997)
+        game.move_player("Player 1", 2)
+        self.assertEqual((game.get_player_current_position("Player 1"),
+                          game.get_player_account_balance("Player 1")), (999, 1000))
+        game.move_player("Player 1", 4)
+        self.assertEqual((game.get_player_current_position("Player 1"),
+                          game.get_player_account_balance("Player 1")), (3, 1100))
+
+    def test45(self):
+        """create_spaces does not change the rent list it is given."""
+        rent_list = [60] * 24
+        game = type(self.game)(verbose=False)
+        game.create_spaces(100, rent_list)
+        self.assertEqual(rent_list, [60] * 24)
+        self.assertEqual(game.get_rent(24), 60)
+
+    def test46(self):
+        """snapshot returns every player's position, balance, and properties as tuples."""
+        self.game.move_player("Player 1", 3)
+        self.game.buy_space("Player 1")
+        self.game.move_player("Player 2", 5)
+        snapshot = self.game.snapshot()
+        self.assertEqual(snapshot, (("Player 1", "Player 2"), (3, 5), (750, 1000), ((3,), ())))
+        self.assertEqual(snapshot.balances, tuple(self.game.get_player_account_balance(name)
+                                                  for name in snapshot.names))
+        self.game.move_player("Player 2", 1)
+        self.assertEqual(snapshot.positions, (3, 5))
+        self.assertEqual(snapshot_games([self.game, self.game]), [self.game.snapshot()] * 2)
+
+    def test47(self):
+        """get_players returns a read-only view."""
+        players = self.game.get_players()
+        with self.assertRaises(TypeError):
+            players["Player 3"] = {"Position": 0, "Balance": 1000, "Properties": []}
+        self.assertEqual(list(players), ["Player 1", "Player 2"])
+
+    def test48(self):
+        """Boards with fewer than 6 spaces are rejected, since a turn would pass GO more than once."""
+        game = type(self.game)(verbose=False)
+        for rent_list in ([], [10], [10] * 4):
+            self.assertRaises(ValueError, game.create_spaces, 100, rent_list)
+        for num_spaces in (-1, 0, 5):
+            self.assertRaises(ValueError, game.create_spaces, 100, None, num_spaces)
+        game.create_spaces(100, [10] * 5)
+        self.assertEqual(len(game.get_spaces()), 6)
+
+    def test49(self):
+        """get_spaces returns an empty dictionary before create_spaces is called."""
+        self.assertEqual(type(self.game)(verbose=False).get_spaces(), {})
+
+    def test50(self):
+        """RealEstateGame accepts balances that are not integers."""
+        self.assertEqual(self.game.create_player("Player 3", 1000.5), True)
+        self.assertEqual(self.game.get_player_account_balance("Player 3"), 1000.5)
+        self.assertEqual(self.game.create_player("Player 1", 10.5), False)
+
+    def test51(self):
+        """An unknown player does not own unowned spaces."""
+        self.assertEqual(self.game.owns("Nobody", 5), False)
+        self.assertEqual(self.game.owns("Player 1", 5), False)
+
+
+class TestBoardTemplate(unittest.TestCase):
+    """Contains unit tests for shared board templates."""
+
+    def test1(self):
+        """Games with the same configuration share one immutable board template."""
+        game = RealEstateGame(verbose=False)
+        game.create_spaces(100, [60] * 24)
+        other = RealEstateGame(verbose=False)
+        other.create_spaces(100, [60] * 24)
+        self.assertIs(game.get_board(), other.get_board())
+        self.assertIs(game.get_board(), board_template(100, (60,) * 24))
+        self.assertEqual(hash(game.get_board()), hash(board_template(100, (60,) * 24)))
+        self.assertEqual(game.get_board().prices[24], 300)
+
+    def test2(self):
+        """Only ownership is kept per game.  get_spaces builds the spaces dictionary with the current owners."""
+        game = RealEstateGame(verbose=False)
+        game.create_spaces()
+        game.create_player("Player 1")
+        game.move_player("Player 1", 3)
+        game.buy_space("Player 1")
+        other = RealEstateGame(verbose=False)
+        other.create_spaces()
+        self.assertEqual(game.get_owners()[:4], [False, None, None, "Player 1"])
+        self.assertEqual(game.get_spaces()[3]["Owner"], "Player 1")
+        self.assertEqual(other.get_spaces()[3]["Owner"], None)
+
+
+class TestBatchedTurns(unittest.TestCase):
+    """Contains unit tests for move_many and play_round."""
+
+    def setUp(self):
+        self.game = RealEstateGame(verbose=False)
+        self.game.create_spaces(100)
+        self.game.create_player("Player 1", 1000)
+        self.game.create_player("Player 2", 1000)
+
+    def test1(self):
+        """move_many returns one outcome per roll and leaves the game as the same moves and purchases would."""
+        rolls = [6, 3, 5, 6, 6, 6, 2]
+        other = self.game.clone()
+        outcomes = self.game.move_many("Player 1", rolls, always_buy)
+        self.assertEqual(list(outcomes), [BOUGHT, BOUGHT, 0, 0, PASSED_GO, 0, 0])
+        for number in rolls:
+            other.move_player("Player 1", number)
+            if other.get_owner(other.get_player_current_position("Player 1")) is None:
+                other.buy_space("Player 1")
+        self.assertEqual(self.game.get_state(), other.get_state())
+
+    def test2(self):
+        """play_round takes one roll and one purchase decision per player.  Rent and bankruptcy are reported."""
+        self.assertEqual(list(self.game.play_round([6, 6], [True, False])), [BOUGHT, PAID_RENT])
+        self.assertEqual(self.game.get_player_account_balance("Player 2"), 925)
+        self.game.set_balance("Player 2", 100)
+        self.assertEqual(list(self.game.play_round([3, 3], [True, False])), [BOUGHT, BANKRUPTED])
+        self.assertEqual(list(self.game.play_round([1, 1], None)), [0, SKIPPED])
+        self.assertEqual(self.game.check_game_over(), "Player 1")
+
+    def test3(self):
+        """Invalid rolls and players are rejected before any turn is played."""
+        self.assertEqual(self.game.move_many("Player 1", [3, 7]), "Invalid move.")
+        self.assertEqual(self.game.move_many("Player 3", [3]), "Invalid player.")
+        self.assertEqual(self.game.play_round([3]), "Invalid move.")
+        self.assertEqual(self.game.get_player_current_position("Player 1"), 0)
+
+    def test4(self):
+        """Games with a sink or instrumentation play the same turns and keep every message and count."""
+        sink = BufferedSink()
+        self.game.set_sink(sink)
+        instrumentation = Instrumentation()
+        instrumentation.attach(self.game)
+        other = self.game.clone()
+        rolls = [6, 6, 6, 6, 6, 6]
+        self.assertEqual(list(self.game.move_many("Player 1", rolls, always_buy)),
+                         list(other.move_many("Player 1", rolls, always_buy)))
+        self.assertEqual(self.game.get_state(), other.get_state())
+        self.assertEqual([message["Event"] for message in sink.messages], ["go_bonus"])
+        self.assertEqual(instrumentation.snapshot()["Calls"]["move_player"], 6)
+
+
+class TestCloneAndRollback(unittest.TestCase):
+    """Contains unit tests for cloning games and rolling back moves."""
+
+    def setUp(self):
+        self.game = RealEstateGame(verbose=False)
+        self.game.create_spaces(100)
+        self.game.create_player("Player 1", 1000)
+        self.game.create_player("Player 2", 1000)
+        self.game.move_player("Player 1", 6)
+        self.game.buy_space("Player 1")
+
+    def test1(self):
+        """Clone has the same state as the original game."""
+        self.assertEqual(self.game.clone().get_state(), self.game.get_state())
+
+    def test2(self):
+        """Moves and purchases in the clone do not change the original game."""
+        state = self.game.get_state()
+        clone = self.game.clone()
+        clone.move_player("Player 2", 6)
+        clone.move_player("Player 2", 3)
+        clone.buy_space("Player 2")
+        self.assertEqual(self.game.get_state(), state)
+        self.assertEqual(clone.get_owner(9), "Player 2")
+        self.assertEqual(self.game.get_owner(9), None)
+
+    def test3(self):
+        """Rollback undoes moves, rent, purchases, and bankruptcy since the checkpoint."""
+        state = self.game.get_state()
+        properties = self.game.get_properties("Player 1")
+        self.game.checkpoint()
+        self.game.set_balance("Player 2", 50)
+        self.game.move_player("Player 2", 6)
+        self.game.move_player("Player 1", 3)
+        self.game.buy_space("Player 1")
+        self.assertEqual(self.game.check_game_over(), "Player 1")
+        self.game.rollback()
+        self.assertEqual(self.game.get_state(), state)
+        self.assertEqual(self.game.check_game_over(), False)
+        self.assertIs(self.game.get_properties("Player 1"), properties)
+
+    def test4(self):
+        """Checkpoints can be nested, and commit keeps the changes."""
+        state = self.game.get_state()
+        self.game.checkpoint()
+        self.game.move_player("Player 2", 3)
+        self.game.buy_space("Player 2")
+        middle = self.game.get_state()
+        self.game.checkpoint()
+        self.game.move_player("Player 2", 3)
+        self.game.rollback()
+        self.assertEqual(self.game.get_state(), middle)
+        self.game.checkpoint()
+        self.game.move_player("Player 1", 1)
+        self.game.commit()
+        self.game.rollback()
+        self.assertEqual(self.game.get_state(), state)
+
+
+class TestCompactGame(TestGame):
+    """Runs the RealEstateGame unit tests against CompactRealEstateGame."""
+
+    def setUp(self):
+        self.game = CompactRealEstateGame()
+        self.game.create_spaces(100)
+        self.game.create_player("Player 1", 1000)
+        self.game.create_player("Player 2", 1000)
+
+    def test37(self):
+        """Compact games use less memory than RealEstateGame games."""
+        self.assertLess(measure_memory_per_game(CompactRealEstateGame, 200),
+                        measure_memory_per_game(RealEstateGame, 200))
+
+    def test38(self):
+        """Games with the same board configuration share the board tuples."""
+        other = CompactRealEstateGame()
+        other.create_spaces(100)
+        self.assertIs(other._rents, self.game._rents)
+
+    def test50(self):
+        """Compact game balances must be integers.  A duplicate name is reported before the balance is checked."""
+        self.assertRaises(ValueError, self.game.create_player, "Player 3", 1000.5)
+        self.assertRaises(ValueError, self.game.set_balance, "Player 1", 10.5)
+        self.assertEqual(self.game.get_player_account_balance("Player 1"), 1000)
+        self.assertEqual(self.game.create_player("Player 1", 10.5), False)
+        self.assertEqual(self.game.create_player("Player 3", 500), True)
+
+    def test52(self):
+        """get_players returns copies of the property lists, so changing them does not change the game."""
+        self.game.move_player("Player 1", 3)
+        self.game.buy_space("Player 1")
+        self.game.get_players()["Player 1"]["Properties"].append(5)
+        self.assertEqual(self.game.get_properties("Player 1"), [3])
+        self.assertEqual(self.game.snapshot().properties[0], (3,))
+
+
+class TestSimulation(unittest.TestCase):
+    """Contains unit tests for headless game simulation."""
+
+    def test1(self):
+        """Simulated game plays to a winner without printing anything."""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            result = simulate_game(4, seed=1)
+        self.assertEqual(output.getvalue(), "")
+        self.assertIn(result.winner, ["Player 1", "Player 2", "Player 3", "Player 4"])
+        self.assertEqual(result.balances[result.winner] > 0, True)
+
+    def test2(self):
+        """The same seed plays the same game."""
+        self.assertEqual(simulate_game(3, seed=7), simulate_game(3, seed=7))
+
+    def test3(self):
+        """Only the winner has a nonzero balance and bankrupt players own no properties."""
+        result = simulate_game(["A", "B"], seed=3)
+        for name in ["A", "B"]:
+            if name != result.winner:
+                self.assertEqual(result.balances[name], 0)
+                self.assertEqual(result.property_counts[name], 0)
+
+    def test4(self):
+        """No one buys property, so the game stops at the round limit without a winner."""
+        result = simulate_game(2, never_buy, seed=1, max_rounds=50)
+        self.assertEqual(result.winner, None)
+        self.assertEqual(result.rounds, 50)
+
+    def test5(self):
+        """Each player can have their own buy policy.  A player who never buys cannot win against one who does."""
+        result = simulate_game(["Buyer", "Saver"], [always_buy, never_buy], seed=5)
+        self.assertEqual(result.winner, "Buyer")
+        self.assertEqual(result.property_counts["Saver"], 0)
+
+
+class TestStalemate(unittest.TestCase):
+    """Contains unit tests for stalemate detection in simulated games."""
+
+    def test1(self):
+        """No one can afford a space and there is no GO bonus, so the game is frozen and stops early."""
+        result = simulate_game(2, seed=1, go_amount=0, starting_balance=200)
+        self.assertEqual((result.winner, result.outcome), (None, FROZEN))
+        self.assertEqual(result.rounds, 16)
+        self.assertEqual(simulate_game(2, seed=1, go_amount=0, starting_balance=200, stalemates=False).outcome,
+                         ROUND_CAP)
+
+    def test2(self):
+        """Stable games stop early and stopping them never changes the winner."""
+        outcomes = []
+        for seed in range(10):
+            result = simulate_game(2, seed=seed, go_amount=5000)
+            self.assertEqual(result.winner, simulate_game(2, seed=seed, go_amount=5000, stalemates=False).winner)
+            outcomes.append(result.outcome)
+            if result.outcome == STABLE:
+                self.assertLess(result.rounds, 1000)
+        self.assertIn(STABLE, outcomes)
+        self.assertEqual(simulate_game(4, seed=2).outcome, WINNER)
+
+    def test3(self):
+        """Games with no purchases for stall_rounds rounds and no expected losses are stalled if asked."""
+        result = simulate_game(2, never_buy, seed=1, stall_rounds=100)
+        self.assertEqual(result.outcome, STALLED)
+        self.assertLessEqual(result.rounds, 128)
+        self.assertEqual(simulate_game(2, never_buy, seed=1).outcome, ROUND_CAP)
+
+    def test4(self):
+        """A player who could go bankrupt before passing GO is not stable."""
+        game = RealEstateGame(verbose=False)
+        game.create_spaces(300, [50, 100, 150, 50, 100, 150])
+        game.create_player("A", 5000)
+        game.create_player("B", 5000)
+        for position in range(1, 7):
+            game.set_position("A" if position % 2 else "B", position)
+            game.buy_space("A" if position % 2 else "B")
+        detector = StalemateDetector()
+        self.assertEqual(detector.check(game, 16), STABLE)
+        game.set_balance("B", 250)
+        self.assertIsNone(StalemateDetector().check(game, 16))
+
+
+class TestDice(unittest.TestCase):
+    """Contains unit tests for dice sources."""
+
+    def test1(self):
+        """A DiceStream gives the same rolls for the same seed, and every face about equally often."""
+        rolls = DiceStream(seed=5).rolls(60000)
+        self.assertEqual(rolls, DiceStream(seed=5, block_size=100).rolls(60000))
+        self.assertNotEqual(rolls[:100], DiceStream(seed=6).rolls(100))
+        for face in range(1, 7):
+            self.assertAlmostEqual(rolls.count(face) / 60000, 1 / 6, delta=0.01)
+
+    def test2(self):
+        """Recorded dice drive a game deterministically, and the game stops when they run out."""
+        result = simulate_game(["Player 1", "Player 2"], dice=RecordedDice([6, 6, 3, 3]))
+        self.assertEqual(result.winner, None)
+        self.assertEqual(result.rounds, 2)
+        self.assertEqual(result.balances, {"Player 1": 300, "Player 2": 825})
+        self.assertEqual(result.property_counts, {"Player 1": 2, "Player 2": 0})
+
+    def test3(self):
+        """Recorded dice must be 1-6 and are rolled in order."""
+        self.assertRaises(ValueError, RecordedDice, [1, 7])
+        dice = RecordedDice([4, 2])
+        self.assertEqual((dice.roll(), dice.roll()), (4, 2))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test4(self):
+        """NumpyDice gives the same rolls 1-6 for the same seed."""
+        rolls = NumpyDice(seed=3).rolls(1000)
+        self.assertEqual(rolls, NumpyDice(seed=3).rolls(1000))
+        self.assertEqual(set(rolls), {1, 2, 3, 4, 5, 6})
+
+
+class TestOptimizer(unittest.TestCase):
+    """Contains unit tests for the buy policy search."""
+
+    def test1(self):
+        """Threshold policies buy by rent tier and keep a reserve relative to the highest rent, and can be pickled."""
+        game = RealEstateGame(verbose=False)
+        game.create_spaces()
+        game.create_player("Player 1", 1000)
+        policy = pickle.loads(pickle.dumps(ThresholdPolicy(min_rent=100, reserve_rents=1)))
+        self.assertEqual(policy(game, "Player 1", 3), False)        # Rent 50
+        self.assertEqual(policy(game, "Player 1", 7), True)         # Rent 100, 500 left after buying
+        self.assertEqual(policy(game, "Player 1", 13), False)       # Rent 200, 0 left after buying
+        self.assertEqual(len(threshold_grid(reserve_rents=(0, 1))), 16)
+
+    def test2(self):
+        """Candidates play the same seeded games, so a candidate's score for a game is reproducible."""
+        self.assertEqual([play_candidate(always_buy, index) for index in range(20)],
+                         [play_candidate(always_buy, index) for index in range(20)])
+        self.assertEqual(sum(play_candidate(never_buy, index) for index in range(20)), 0)
+
+    def test3(self):
+        """The adaptive search finds the same best policy as a fixed grid with fewer games."""
+        candidates = [never_buy, ThresholdPolicy(350), always_buy, ThresholdPolicy(150)]
+        grid = grid_search(candidates, games=300)
+        result = optimize_policy(candidates, batch_size=20, max_games=300)
+        self.assertIs(result.best, grid.best)
+        self.assertLess(result.total_games, grid.total_games / 2)
+        self.assertEqual(result.games[0], 20)                   # never_buy is dropped after the first rung
+
+
+class TestTournament(unittest.TestCase):
+    """Contains unit tests for the multi-process tournament runner."""
+
+    def test1(self):
+        """Every game is counted once, as a win or as a game without a winner."""
+        stats = run_tournament(40, 3, master_seed=1, workers=1)
+        self.assertEqual(stats["Games"], 40)
+        self.assertEqual(sum(stats["Wins"].values()) + stats["No Winner"], 40)
+        self.assertEqual(sum(stats["Rounds"].values()), 40)
+
+    def test2(self):
+        """Worker processes give the same statistics as playing every game in this process."""
+        self.assertEqual(run_tournament(30, 2, master_seed=9, workers=2, shard_size=7),
+                         run_tournament(30, 2, master_seed=9, workers=1))
+
+    def test3(self):
+        """A single game of a tournament can be re-run by itself."""
+        result = replay_game(3, 0, 2)
+        stats = run_tournament(1, 2, master_seed=3, workers=1)
+        self.assertEqual(stats["Wins"][result.winner], 1)
+        self.assertEqual(stats["Total Rounds"], result.rounds)
+
+    def test4(self):
+        """Games get different seeds from each other and from other master seeds."""
+        seeds = set(game_seed(master, index) for master in range(5) for index in range(100))
+        self.assertEqual(len(seeds), 500)
+
+
+class TestSweep(unittest.TestCase):
+    """Contains unit tests for the resumable simulation sweep."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.configs = sweep_configs(starting_balance=[300, 600], go_amount=[50])
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test1(self):
+        """Configurations are every combination of the option values."""
+        self.assertEqual(sweep_configs(a=[1, 2], b=[3]), [{"a": 1, "b": 3}, {"a": 2, "b": 3}])
+
+    def test2(self):
+        """A sweep stopped part way resumes from the chunks not done and matches run_tournament."""
+        Sweep(self.path, self.configs, 25, 10, players=2, master_seed=5).close()
+        self.assertEqual(run_worker(self.path, max_chunks=2), 2)
+        sweep = Sweep(self.path, self.configs, 25, 10, players=2, master_seed=5)
+        progress = sweep.progress()
+        self.assertEqual((progress["Done"], progress["Pending"], progress["Games Done"]), (2, 4, 20))
+        sweep.close()
+        results = run_sweep(self.path, self.configs, 25, 10, players=2, master_seed=5, workers=1, progress=None)
+        for config, stats in zip(self.configs, results):
+            self.assertEqual(stats, run_tournament(25, 2, master_seed=5, workers=1, **config))
+        self.assertEqual(run_worker(self.path), 0)
+
+    def test3(self):
+        """Expired leases are leased again, a chunk is only completed once, and a different sweep is rejected."""
+        sweep = Sweep(self.path, self.configs[:1], 10, 10, players=2, lease_seconds=0)
+        chunk = sweep.lease("a")
+        self.assertEqual(chunk, (1, 0, 0, 10))
+        self.assertEqual(sweep.lease("b"), chunk)
+        self.assertTrue(sweep.complete(chunk[0], run_tournament(10, 2, workers=1, **self.configs[0]), 1.0))
+        self.assertFalse(sweep.complete(chunk[0], run_tournament(10, 2, workers=1, **self.configs[0]), 1.0))
+        self.assertIsNone(sweep.lease("c"))
+        sweep.close()
+        self.assertRaises(ValueError, Sweep, self.path, self.configs, 10, 10, players=2)
+
+    def test4(self):
+        """Worker processes play the sweep and report progress."""
+        reports = []
+        results = run_sweep(self.path, self.configs, 20, 5, players=2, workers=2, progress=reports.append,
+                            interval=0.1)
+        self.assertEqual([stats["Games"] for stats in results], [20, 20])
+        self.assertEqual(reports[-1]["Done"], 8)
+
+    def test5(self):
+        """The buy policy is recorded in the manifest, and workers with a different policy cannot join."""
+        policy = ThresholdPolicy(100, 1)
+        Sweep(self.path, self.configs, 20, 10, players=2, policy=policy).close()
+        self.assertEqual(manifest_spec(self.path)["Policy"], "ThresholdPolicy(min_rent=100, reserve_rents=1)")
+        self.assertRaises(ValueError, run_worker, self.path)
+        self.assertRaises(ValueError, run_worker, self.path, never_buy)
+        self.assertEqual(run_worker(self.path, policy_from_name(policy_name(policy))), 4)
+        self.assertEqual(policy_from_name(policy_name(None)), always_buy)
+        self.assertEqual(policy_name([never_buy, policy]), ["simulation.never_buy", repr(policy)])
+        self.assertRaises(ValueError, policy_from_name, "ai.MonteCarloPlayer")
+
+
+class TestResultsStore(unittest.TestCase):
+    """Contains unit tests for the columnar results file."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test1(self):
+        """Results written across several chunks are read back column by column and aggregated."""
+        writer = ResultsWriter(self.path, 2, 3, chunk_rows=8)
+        for index in range(20):
+            winner = -1 if index % 5 == 0 else index % 2
+            writer.append(index, index % 2, winner, 10 + index % 3, [index, -index], [-1, index % 2, -1])
+        writer.close()
+        reader = ResultsReader(self.path)
+        self.assertEqual(len(reader), 20)
+        self.assertEqual([list(seeds) for seeds, in reader.chunks("Seed")],
+                         [list(range(8)), list(range(8, 16)), list(range(16, 20))])
+        self.assertEqual(reader.win_rates(), {0: {None: 0.2, 0: 0.8}, 1: {None: 0.2, 1: 0.8}})
+        self.assertEqual(reader.length_histogram(), {10: 7, 11: 7, 12: 6})
+        self.assertEqual(reader.ownership_frequencies(), [[0.0, 0.0], [0.5, 0.5], [0.0, 0.0]])
+        reader.close()
+
+    def test2(self):
+        """Simulated games written to a results file give the same wins as a tournament with the same seeds."""
+        write_simulations(self.path, 60, players=3, master_seed=4, chunk_rows=16)
+        stats = run_tournament(60, players=3, master_seed=4, workers=1)
+        reader = ResultsReader(self.path)
+        rates = reader.win_rates()[0]
+        for number, name in enumerate(["Player 1", "Player 2", "Player 3"]):
+            self.assertAlmostEqual(rates.get(number, 0.0), stats["Wins"][name] / 60)
+        self.assertEqual(reader.length_histogram(), stats["Rounds"])
+        self.assertEqual(len(reader.ownership_frequencies()), 25)
+        reader.close()
+
+    def test3(self):
+        """Files that are not results files, chunk sizes that are not multiples of 8, and bad player numbers fail."""
+        with open(self.path, "wb") as file:
+            file.write(b"not a results file")
+        self.assertRaises(ValueError, ResultsReader, self.path)
+        self.assertRaises(ValueError, ResultsWriter, self.path, 2, 25, 10)
+        self.assertRaises(ValueError, ResultsWriter, self.path, 128, 25)
+        writer = ResultsWriter(self.path, 2, 3, chunk_rows=8)
+        self.assertRaises(ValueError, writer.append, 0, 0, 2, 10, [1, 2], [-1, 0, 1])
+        self.assertRaises(ValueError, writer.append, 0, 0, 1, 10, [1, 2], [-1, 0, 200])
+        self.assertRaises(ValueError, writer.append, 0, 0, 1, 10, [1, 2], [-2, 0, 1])
+        writer.append(0, 0, 1, 10, [1, 2], [-1, 0, 1])
+        writer.close()
+        reader = ResultsReader(self.path)
+        self.assertEqual(len(reader), 1)
+        reader.close()
+
+    def test4(self):
+        """write_simulations stops stalemates like run_tournament does, records outcomes, and writes empty files."""
+        write_simulations(self.path, 20, players=2, master_seed=1, chunk_rows=8, go_amount=5000)
+        stats = run_tournament(20, players=2, master_seed=1, workers=1, go_amount=5000)
+        reader = ResultsReader(self.path)
+        self.assertEqual(reader.length_histogram(), stats["Rounds"])
+        outcomes = reader.outcome_counts()
+        self.assertEqual(sum(outcomes.values()), 20)
+        self.assertEqual(outcomes[WINNER], 20 - stats["No Winner"])
+        self.assertEqual(outcomes[ROUND_CAP], 0)
+        reader.close()
+        write_simulations(self.path, 0, players=3, num_spaces=30)
+        reader = ResultsReader(self.path)
+        self.assertEqual((len(reader), reader.num_players, reader.num_spaces), (0, 3, 30))
+        self.assertEqual(reader.win_rates(), {})
+        reader.close()
+
+    def test5(self):
+        """Readers use the header and chunk sizes recorded by the writer, not their own mmap granularity."""
+        writer = ResultsWriter(self.path, 2, 3, chunk_rows=8)
+        for index in range(12):
+            writer.append(index, 0, index % 2, index, [index, -index], [-1, 0, 1])
+        writer.close()
+        with open(self.path, "rb") as file:
+            data = file.read()
+        fields = list(HEADER.unpack_from(data))
+        header_size, chunk_size = fields[6], fields[7]
+        chunks = [data[start:start + chunk_size] for start in range(header_size, len(data), chunk_size)]
+        fields[6:8] = header_size + 64, chunk_size + 64
+        with open(self.path, "wb") as file:
+            file.write(HEADER.pack(*fields).ljust(header_size + 64, b"\0"))
+            for chunk in chunks:
+                file.write(chunk.ljust(chunk_size + 64, b"\0"))
+        reader = ResultsReader(self.path)
+        self.assertEqual([list(seeds) for seeds, in reader.chunks("Seed")], [list(range(8)), list(range(8, 12))])
+        self.assertEqual(reader.win_rates(), {0: {0: 0.5, 1: 0.5}})
+        reader.close()
+
+
+class TestSolver(unittest.TestCase):
+    """Contains unit tests for the expectimax solver."""
+
+    def setUp(self):
+        self.game = RealEstateGame(verbose=False)
+        self.game.create_spaces(0, [10] * 6)
+        self.game.create_player("A", 60)
+        self.game.create_player("B", 60)
+
+    def test1(self):
+        """A player who can only survive by rolling a 6 loses within one turn with probability 5/6."""
+        self.game.set_balance("A", 2000)
+        for space in range(1, 7):
+            self.game.set_position("A", space)
+            self.game.buy_space("A")
+        self.game.set_position("B", 1)
+        self.game.set_balance("B", 5)
+        solver = ExpectimaxSolver(horizon=1)
+        probabilities = solver.solve(self.game, "B")
+        self.assertAlmostEqual(probabilities["A"], 5 / 6)
+        self.assertEqual(probabilities["B"], 0.0)
+
+    def test2(self):
+        """The transposition table is bounded, reports hits, and does not change the result."""
+        exact = ExpectimaxSolver(horizon=6)
+        probabilities = exact.solve(self.game, "A")
+        self.assertGreater(exact.hit_rate(), 0.0)
+        self.assertGreater(exact.nodes_per_second(), 0.0)
+        small = ExpectimaxSolver(horizon=6, max_table_size=100)
+        self.assertEqual(small.solve(self.game, "A"), probabilities)
+        self.assertLessEqual(len(small._table), 100)
+        self.assertGreater(small.evictions, 0)
+        self.assertGreater(small.nodes, exact.nodes)
+        self.assertAlmostEqual(probabilities["A"], 0.21540637860082304)
+        self.assertAlmostEqual(probabilities["B"], 0.0964506172839506)
+
+    def test3(self):
+        """The solver's moves match RealEstateGame.move_player."""
+        solver = ExpectimaxSolver()
+        random.seed(3)
+        for trial in range(200):
+            game = self.game.clone()
+            for number in (random.randint(1, 6) for _ in range(random.randint(0, 8))):
+                for name in ("A", "B"):
+                    game.move_player(name, number)
+                    if random.random() < 0.5:
+                        game.buy_space(name)
+            names, (turn, positions, balances, owners) = solver._load(game)
+            number = random.randint(1, 6)
+            positions, balances, owners, can_buy = solver.move(0, positions, balances, owners, number)
+            game.move_player("A", number)
+            self.assertEqual(solver._load(game)[1], (0, positions, balances, owners))
+
+    def test4(self):
+        """The best buy decision is at least as good as the other decision, and can be used as a buy policy."""
+        solver = ExpectimaxSolver(horizon=6)
+        self.game.set_position("A", 6)
+        buy, probabilities = solver.decide(self.game, "A")
+        passing = self.game.clone()
+        bought = self.game.clone()
+        bought.buy_space("A")
+        # decide counts the current turn in the horizon, so the next turn has one turn less.
+        after = ExpectimaxSolver(horizon=5)
+        self.assertGreaterEqual(probabilities["A"], max(after.solve(bought, "B")["A"], after.solve(passing, "B")["A"]))
+        self.assertAlmostEqual(probabilities["A"], after.solve(bought if buy else passing, "B")["A"])
+        self.assertEqual(solver(self.game, "A", 6), buy)
+
+
+class TestAnalytics(unittest.TestCase):
+    """Contains unit tests for the Markov chain board analysis."""
+
+    def test1(self):
+        """Each row of the transition matrix sums to one."""
+        for row in transition_matrix(25):
+            self.assertAlmostEqual(sum(row), 1)
+
+    def test2(self):
+        """With one die on a circular board, every space is equally likely in the long run."""
+        for probability in stationary_distribution(25):
+            self.assertAlmostEqual(probability, 1 / 25)
+
+    def test3(self):
+        """Expected rent per turn and payback rounds for King's Landing with four players."""
+        space = analyze_board(num_players=4)["Properties"][24]
+        self.assertEqual(space["Name"], "King's Landing")
+        self.assertAlmostEqual(space["Rent Per Turn"], 350 / 25)
+        self.assertAlmostEqual(space["Payback Rounds"], 1750 / (350 / 25 * 3))
+
+    def test4(self):
+        """A turn lands on or passes GO 3.5 times in 25 on average."""
+        self.assertAlmostEqual(analyze_board(100)["GO Bonus Per Turn"], 100 * 3.5 / 25)
+
+    def test5(self):
+        """Landing frequencies from moving a player agree with the landing probabilities."""
+        game = RealEstateGame(verbose=False)
+        game.create_spaces()
+        game.create_player("Player 1")
+        rolls = [1, 2, 3, 4, 5, 6, 6, 5, 4, 3, 2, 1, 2, 4, 6, 1, 3, 5] * 500
+        counts = [0] * 25
+        for number in rolls:
+            game.move_player("Player 1", number)
+            counts[game.get_player_current_position("Player 1")] += 1
+        for position in range(25):
+            self.assertAlmostEqual(counts[position] / len(rolls), stationary_distribution(25)[position], delta=0.01)
+
+    def test6(self):
+        """analyze_board does not change the given rent list."""
+        rent_list = [10] * 24
+        analyze_board(50, rent_list)
+        self.assertEqual(rent_list, [10] * 24)
+
+
+class TestSinks(unittest.TestCase):
+    """Contains unit tests for sending game messages to sinks."""
+
+    def play(self, game):
+        """Player 1 passes GO, buys space 2, and Player 2 goes bankrupt paying rent and then tries to move again."""
+        game.create_spaces(100)
+        game.create_player("Player 1", 1000)
+        game.create_player("Player 2", 20)
+        game.set_position("Player 1", 23)
+        game.move_player("Player 1", 4)
+        game.buy_space("Player 1")
+        game.move_player("Player 2", 2)
+        game.move_player("Player 2", 2)
+
+    def test1(self):
+        """By default messages are printed, and the GO bonus message shows the GO amount."""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.play(RealEstateGame())
+        self.assertEqual(output.getvalue(), "Go Bonus: $100!\nOh no!  You must declare bankruptcy and forfeit all "
+                                            "property\nZero balance. :(  Next player's turn!\n")
+
+    def test2(self):
+        """A null sink prints nothing."""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.play(RealEstateGame(sink=NullSink()))
+        self.assertEqual(output.getvalue(), "")
+
+    def test3(self):
+        """A buffered sink keeps each message with its event and fields."""
+        sink = BufferedSink()
+        self.play(RealEstateGame(sink=sink))
+        self.assertEqual([message["Event"] for message in sink.messages], ["go_bonus", "bankruptcy", "zero_balance"])
+        self.assertEqual(sink.messages[1]["owner"], "Player 1")
+        self.assertEqual(sink.messages[1]["amount"], 20)
+
+    def test4(self):
+        """A JSON lines sink writes one line per message in batches."""
+        stream = io.StringIO()
+        sink = JsonlSink(stream, batch_size=2)
+        self.play(CompactRealEstateGame(sink=sink))
+        self.assertEqual(len(stream.getvalue().splitlines()), 2)
+        sink.close()
+        self.assertEqual(json.loads(stream.getvalue().splitlines()[2])["Event"], "zero_balance")
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    """Contains unit tests for the asyncio game server, using a local client."""
+
+    async def asyncSetUp(self):
+        self.server = GameServer(turn_timeout=0.1, seed=1)
+        listener = await self.server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        self.server.close()
+
+    async def command(self, line):
+        """Sends a command line and returns the reply line."""
+        self.writer.write((line + "\n").encode())
+        await self.writer.drain()
+        return (await self.reader.readline()).decode().strip()
+
+    async def test1(self):
+        """A new game starts with the first player's turn."""
+        self.assertEqual(await self.command("NEW Player 1,Player 2"), "GAME 1 NEXT Player 1")
+
+    async def test2(self):
+        """Player rolls, buys the space, and the turn passes to the next player."""
+        await self.command("NEW Player 1,Player 2")
+        reply = await self.command("ROLL 1")
+        self.assertEqual(reply.startswith("ROLLED") and reply.endswith("DECIDE"), True)
+        self.assertEqual(await self.command("BUY 1"), "BOUGHT NEXT Player 2")
+        state = json.loads((await self.command("STATE 1"))[len("STATE "):])
+        self.assertEqual(len(state["Players"][0][3]), 1)
+
+    async def test3(self):
+        """A player who takes too long has their turn finished by the server without blocking other games."""
+        await self.command("NEW Player 1,Player 2")
+        await self.command("NEW Player 3,Player 4")
+        await asyncio.sleep(0.15)
+        state = json.loads((await self.command("STATE 1"))[len("STATE "):])
+        self.assertEqual(state["Turn"], "Player 2")
+        self.assertEqual(state["Players"][0][3], [])
+        self.assertEqual((await self.command("STATS 2")).split()[1], "1")
+
+    async def test4(self):
+        """Commands out of turn order and unknown games are errors."""
+        await self.command("NEW Player 1,Player 2")
+        self.assertEqual(await self.command("BUY 1"), "ERROR Roll first.")
+        self.assertEqual(await self.command("ROLL 7"), "ERROR Invalid game.")
+        self.assertEqual(await self.command("NEW Player 1,Player 1"), "ERROR Player names must be unique.")
+
+    async def test5(self):
+        """Many games can be hosted at once and turn latency percentiles are reported."""
+        for i in range(200):
+            await self.command("NEW A,B")
+        for game_id in range(1, 201):
+            if (await self.command("ROLL " + str(game_id))).endswith("DECIDE"):
+                await self.command("PASS " + str(game_id))
+        turns, p50, p95, p99 = self.server.latency_percentiles()
+        self.assertEqual(turns >= 200, True)
+        self.assertEqual(p50 <= p95 <= p99, True)
+
+    async def test6(self):
+        """A game is removed once it has a winner, and its turns still count in the server's latency percentiles."""
+        await self.command("NEW A,B")
+        self.server.sessions[1].game.set_balance("B", 0)
+        reply = await self.command("ROLL 1")
+        if reply.endswith("DECIDE"):
+            reply = await self.command("PASS 1")
+        self.assertEqual(reply.endswith("WINNER A"), True)
+        self.assertEqual(self.server.sessions, {})
+        self.assertEqual(await self.command("STATE 1"), "ERROR Invalid game.")
+        self.assertEqual(self.server.latency_percentiles()[0], 1)
+
+    async def test7(self):
+        """Games a client created are abandoned when the client quits or disconnects, and their timers cancelled."""
+        await self.command("NEW A,B")
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.writer.get_extra_info("peername")[1])
+        writer.write(b"NEW C,D\nNEW E,F\n")
+        await reader.readline()
+        await reader.readline()
+        session = self.server.sessions[2]
+        writer.close()
+        await asyncio.sleep(0.05)
+        self.assertEqual(list(self.server.sessions), [1])
+        self.assertEqual(session._timer, None)
+        self.assertEqual(await self.command("QUIT"), "BYE")
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.server.sessions, {})
+
+
+    async def test8(self):
+        """A game won when a turn times out is kept until a reply announces the winner, or a grace period ends."""
+        await self.command("NEW A,B")
+        self.server.sessions[1].game.set_balance("B", 0)
+        await asyncio.sleep(0.15)
+        self.assertEqual(list(self.server.sessions), [1])
+        state = json.loads((await self.command("STATE 1"))[len("STATE "):])
+        self.assertEqual(state["Winner"], "A")
+        self.assertEqual(self.server.sessions, {})
+        self.server._finished_timeout = 0.05
+        await self.command("NEW C,D")
+        self.server.sessions[2].game.set_balance("D", 0)
+        await asyncio.sleep(0.1)
+        self.assertEqual(await self.command("ROLL 2"), "ERROR Game over. WINNER C")
+        await self.command("NEW E,F")
+        self.server.sessions[3].game.set_balance("F", 0)
+        await asyncio.sleep(0.3)
+        self.assertEqual(self.server.sessions, {})
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Contains a quick check of the benchmark suite."""
+
+    def test1(self):
+        """A small benchmark run measures every benchmark and can be saved as JSON and compared."""
+        results = json.loads(json.dumps(run_benchmarks(scale=0.005)))
+        self.assertEqual(sorted(results["Games"]), sorted(str(n) + "x" + str(size) for n in range(2, 11)
+                                                          for size in (25, 1000)))
+        self.assertEqual(sorted(results["RealEstateGame"]["Board Scaling"]), ["1000", "100000", "25"])
+        self.assertGreater(results["RealEstateGame"]["Turn Nanoseconds"], 0)
+        self.assertGreater(results["CompactRealEstateGame"]["Memory"]["Bytes Per Game"], 0)
+        self.assertEqual(set(change for key, old, new, change in compare(results, results)), {0.0})
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Contains unit tests for the Instrumentation class."""
+
+    def setUp(self):
+        """Creates a two player game with an instrumentation object attached."""
+        self.game = RealEstateGame(verbose=False)
+        self.game.create_spaces(100, [50] * 24)
+        self.game.create_player("Alice", 300)
+        self.game.create_player("Bob", 40)
+        self.instrumentation = Instrumentation()
+        self.instrumentation.attach(self.game)
+
+    def test1(self):
+        """Calls, rent transferred, GO bonuses, purchases, and bankruptcies per round are counted."""
+        self.game.move_player("Alice", 3)
+        self.game.buy_space("Alice")                            # Purchase price of space 3 is 250
+        self.game.move_player("Alice", 6)                       # Alice moves again, so round 2 starts
+        self.game.move_player("Bob", 3)                         # Bob pays 40 and goes bankrupt
+        snapshot = json.loads(json.dumps(self.instrumentation.snapshot()))
+        self.assertEqual(snapshot["Calls"], {"move_player": 3, "pay_rent": 1, "buy_space": 1,
+                                             "declare_bankruptcy": 1})
+        self.assertEqual(snapshot["Rent Transferred"], 40)
+        self.assertEqual(snapshot["Purchases"], 1)
+        self.assertEqual(snapshot["Purchase Amount"], 250)
+        self.assertEqual(snapshot["Bankruptcies Per Round"], {"2": 1})
+        self.assertEqual(sum(snapshot["Histograms"]["move_player"].values()), 3)
+        self.assertEqual(self.game.check_game_over(), "Alice")
+
+    def test2(self):
+        """GO bonuses are counted, and snapshot with reset starts the counters again."""
+        for number in (6, 6, 6, 6, 2):                          # Passes GO on the last move
+            self.game.move_player("Alice", number)
+        snapshot = self.instrumentation.snapshot(reset=True)
+        self.assertEqual((snapshot["GO Bonuses"], snapshot["GO Bonus Amount"]), (1, 100))
+        self.assertEqual(self.instrumentation.snapshot()["Calls"]["move_player"], 0)
+
+    def test3(self):
+        """A detached game runs its normal methods and is no longer counted."""
+        Instrumentation.detach(self.game)
+        self.assertNotIn("move_player", vars(self.game))
+        self.game.move_player("Alice", 3)
+        self.assertEqual(self.instrumentation.snapshot()["Calls"]["move_player"], 0)
+        self.assertEqual(self.game.get_player_current_position("Alice"), 3)
+
+    def test4(self):
+        """Players and the board created after attaching are used, and rounds follow the turn order."""
+        game = RealEstateGame(verbose=False)
+        self.instrumentation.attach(game)
+        game.create_spaces(500, [50] * 24)
+        game.create_player("Alice", 1000)
+        game.create_player("Bob", 10)
+        game.move_player("Alice", 3)
+        game.buy_space("Alice")
+        game.move_player("Bob", 1)
+        game.move_player("Alice", 1)
+        game.move_player("Bob", 2)                              # Bob pays 10 in round 2 and goes bankrupt
+        snapshot = self.instrumentation.snapshot()
+        self.assertEqual(snapshot["Purchase Amount"], 250)
+        self.assertEqual(snapshot["Rent Transferred"], 10)
+        self.assertEqual(snapshot["Bankruptcies Per Round"], {2: 1})
+
+
+class TestMonteCarloPlayer(unittest.TestCase):
+    """Contains unit tests for the Monte Carlo search computer opponent."""
+
+    def setUp(self):
+        self.game = RealEstateGame(verbose=False)
+        self.game.create_spaces(100)
+        self.game.create_player("Player 1", 1000)
+        self.game.create_player("Computer", 1000)
+        self.player = MonteCarloPlayer(time_budget=0.01, seed=1)
+
+    def test1(self):
+        """Computer does not search if it cannot afford the space."""
+        self.game.set_balance("Computer", 100)
+        self.game.move_player("Computer", 6)
+        self.assertEqual(self.player.decide(self.game, "Computer"), False)
+        self.assertEqual(self.player.rollouts, 0)
+
+    def test2(self):
+        """Search does not change the game and reports rollouts per second."""
+        self.game.move_player("Computer", 6)
+        state = self.game.get_state()
+        self.assertIn(self.player.decide(self.game, "Computer"), [True, False])
+        self.assertEqual(self.game.get_state(), state)
+        self.assertGreater(self.player.rollouts, 0)
+        self.assertGreater(self.player.rollouts_per_second(), 0)
+
+    def test3(self):
+        """Each search of the same state plays its own rollouts within the time budget."""
+        self.game.move_player("Computer", 6)
+        self.player.decide(self.game, "Computer")
+        first = self.player.rollouts
+        self.player.decide(self.game, "Computer")
+        self.assertGreater(first, 0)
+        self.assertGreater(self.player.rollouts, first)
+
+    def test4(self):
+        """Computer can be used as a buy policy in a headless simulation."""
+        result = simulate_game(["Player 1", "Computer"], [always_buy, MonteCarloPlayer(0.001, seed=2)], seed=4,
+                               max_rounds=20)
+        self.assertEqual(result.rounds <= 20, True)
+
+
+class TestJournal(unittest.TestCase):
+    """Contains unit tests for the binary game journal."""
+
+    def setUp(self):
+        self.game = RealEstateGame(verbose=False)
+        self.game.create_spaces(100)
+        self.game.create_player("Player 1", 1000)
+        self.game.create_player("Player 2", 1000)
+        self.stream = io.BytesIO()
+        self.snapshots = io.StringIO()
+        self.journal = GameJournal(self.stream, self.snapshots, snapshot_interval=10, buffer_records=8)
+        self.game.set_journal(self.journal)
+
+    def play(self, turns):
+        """Both players take turns rolling 1 to 6 in order and buy every space they can."""
+        for turn in range(turns):
+            name = "Player " + str(turn % 2 + 1)
+            self.game.move_player(name, turn % 6 + 1)
+            self.game.buy_space(name)
+
+    def test1(self):
+        """Journal records a move, purchase, and rent payment."""
+        self.game.move_player("Player 1", 6)
+        self.game.buy_space("Player 1")
+        self.game.move_player("Player 2", 6)
+        self.journal.close()
+        self.stream.seek(0)
+        self.assertEqual(list(read_events(self.stream)), [("Move", "Player 1", 0, 6), ("Buy", "Player 1", 6, 375),
+                                                          ("Move", "Player 2", 0, 6), ("Rent", "Player 2", 6, 75)])
+
+    def test2(self):
+        """Journal records a GO bonus, a set_balance call, and a bankruptcy."""
+        self.game.set_position("Player 1", 23)
+        self.game.move_player("Player 1", 4)
+        self.game.buy_space("Player 1")
+        self.game.set_balance("Player 2", 20)
+        self.game.move_player("Player 2", 2)
+        self.journal.close()
+        self.stream.seek(0)
+        events = list(read_events(self.stream))
+        self.assertIn(("GO Bonus", "Player 1", 0, 100), events)
+        self.assertIn(("Set Balance", "Player 2", 0, 20), events)
+        self.assertEqual(events[-1], ("Bankrupt", "Player 2", 0, 20))
+
+    def test3(self):
+        """Replaying the journal gives the same game state."""
+        self.play(200)
+        self.journal.close()
+        self.stream.seek(0)
+        self.assertEqual(replay(self.stream).get_state(), self.game.get_state())
+
+    def test4(self):
+        """Replaying to a turn from a snapshot gives the same state as replaying from the first turn."""
+        self.play(200)
+        self.journal.close()
+        self.assertNotEqual(self.snapshots.getvalue(), "")
+        for turn in [0, 9, 10, 57, 123, 200]:
+            self.stream.seek(0)
+            self.snapshots.seek(0)
+            from_snapshot = replay(self.stream, self.snapshots, turn)
+            self.stream.seek(0)
+            self.assertEqual(from_snapshot.get_state(), replay(self.stream, turn=turn).get_state())
+
+    def test5(self):
+        """Records are a fixed width of 32 bytes."""
+        header_size = len(self.stream.getvalue())
+        self.play(30)
+        self.journal.flush()
+        self.assertEqual((len(self.stream.getvalue()) - header_size) % 32, 0)
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestBatchGame(unittest.TestCase):
+    """Contains unit tests for the NumPy batch engine."""
+
+    def test1(self):
+        """Player 1 buys space 6 and Player 2 pays rent, the same as a single RealEstateGame."""
+        batch = BatchGame(3, 2)
+        batch.play_round(numpy.full((3, 2), 6))
+        self.assertEqual(batch.get_balances().tolist(), [[700, 925]] * 3)
+        self.assertEqual(batch.get_owners()[:, 6].tolist(), [0, 0, 0])
+
+    def test2(self):
+        """Player who passes GO receives the GO bonus and position wraps around the board."""
+        batch = BatchGame(1, 2, go_amount=100)
+        batch.set_position(0, 0, 23)
+        batch.play_round([[4, 1]], buy=lambda *args: numpy.zeros(1, dtype=bool))
+        self.assertEqual(batch.get_positions()[0, 0], 2)
+        self.assertEqual(batch.get_balances()[0, 0], 1100)
+
+    def test3(self):
+        """Player who cannot pay rent goes bankrupt, pays the owner their balance, and forfeits properties."""
+        batch = BatchGame(1, 2)
+        batch.set_balance(0, 1, 300)
+        batch.play_round([[6, 3]])
+        batch.play_round([[6, 3]])
+        self.assertEqual(batch.get_balances().tolist(), [[675, 0]])
+        self.assertEqual(batch.get_owners()[0, 3], -1)
+        self.assertEqual(batch.get_winners()[0], 0)
+        self.assertEqual(batch.get_active()[0], False)
+
+    def test4(self):
+        """Every game in the batch finishes with exactly one player with money."""
+        batch = BatchGame(200, 4, seed=2)
+        winners = batch.run()
+        self.assertEqual(batch.get_active().any(), False)
+        solvent = batch.get_balances() != 0
+        self.assertEqual(solvent.sum(axis=1).tolist(), [1] * 200)
+        self.assertEqual(winners.tolist(), solvent.argmax(axis=1).tolist())
+
+    def test5(self):
+        """Finished games are not changed by later rounds."""
+        batch = BatchGame(50, 2, seed=4)
+        batch.run(max_rounds=100)
+        done = ~batch.get_active()
+        balances = batch.get_balances()[done].copy()
+        rounds = batch.get_rounds()[done].copy()
+        batch.play_round()
+        self.assertEqual(batch.get_balances()[done].tolist(), balances.tolist())
+        self.assertEqual(batch.get_rounds()[done].tolist(), rounds.tolist())
+
+
+class RentBugGame(RealEstateGame):
+    """A RealEstateGame with a deliberate rule change for TestDifferential: space 1 costs 1 more rent."""
+
+    def pay_rent(self, name, position, owner):
+        super().pay_rent(name, position, owner)
+        balance = self.get_player_account_balance(name)
+        if position == 1 and balance > 1:
+            self.set_balance(name, balance - 1)
+
+
+class TestDifferential(unittest.TestCase):
+    """Contains unit tests for the differential harness between RealEstateGame and the fast engines."""
+
+    def test1(self):
+        """Every engine plays the same rules as RealEstateGame in random games."""
+        results = run_differential(80, 40, seed=1)
+        self.assertEqual(results["Divergences"], [])
+        self.assertGreater(results["Turns"], 5000)
+
+    def test2(self):
+        """A divergence is found and shrunk to a minimal roll sequence that still diverges."""
+        def engine(case):
+            return trace_game(RentBugGame, case)
+
+        divergence = check_case(engine, random_case(4))
+        self.assertIsNotNone(divergence)
+        shrunk = shrink(divergence)
+        self.assertEqual((shrunk.case.rolls, shrunk.case.decisions, shrunk.turn), ([1, 1], [True, False], 1))
+        self.assertEqual(check_case(engine, shrunk.case).actual, shrunk.actual)
+        self.assertIsNone(check_case(lambda case: trace_game(RealEstateGame, case), shrunk.case))
+
+    def test3(self):
+        """Turns played through the public methods (games with a sink) give the same outcomes as the inline loop."""
+        def play(case, sink, balance=None):
+            game = RealEstateGame(verbose=False, sink=sink)
+            game.create_spaces(case.go_amount, case.rent_list)
+            for player in range(case.num_players):
+                game.create_player("Player " + str(player + 1), case.starting_balance)
+            if balance is not None:
+                game.set_balance("Player 1", balance)
+                game.set_position("Player 1", len(case.rent_list))
+            players = case.num_players
+            outcomes = [list(game.play_round(case.rolls[first:first + players], case.decisions[first:first + players]))
+                        for first in range(0, len(case.rolls), players)]
+            return outcomes, game.snapshot()
+
+        for seed in range(20):
+            case = random_case(seed, 20)
+            self.assertEqual(play(case, BufferedSink()), play(case, None))
+        # Player 1 starts one space before GO with a negative balance that the GO bonus brings to exactly zero.
+        case = random_case(0, 1)
+        case = case._replace(go_amount=100, rolls=[1] * case.num_players)
+        public, inline = play(case, BufferedSink(), -100), play(case, None, -100)
+        self.assertEqual(public, inline)
+        self.assertEqual(inline[0][0][0], PASSED_GO)
+
+
 if __name__ == '__main__':
   unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,111 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class MonteCarloPlayer, a computer opponent that decides whether to buy a space by a flat
+#              Monte Carlo search over its two choices.  Each search plays random rollouts of the rest of the game
+#              from clones of the current game, after buying or after passing, and chooses which to play next with
+#              the UCB1 rule until its time budget runs out.  Each decision starts from fresh statistics.  A
+#              MonteCarloPlayer can be used as a buy policy by the driver and by simulate_game.
+import math
+import time
+from dice import DiceStream
+from simulation import play_rounds, always_buy
+
+BUY = True
+PASS = False
+
+
+class MonteCarloPlayer:
+    """
+    A class to represent a computer opponent that decides purchases with a flat Monte Carlo search.
+    """
+    def __init__(self, time_budget=0.05, rollout_rounds=30, exploration=1.4, seed=None):
+        """
+        Creates a MonteCarloPlayer.  time_budget is the number of seconds to search for each decision.  Each rollout
+        plays at most rollout_rounds rounds with every player buying every space they can.  exploration is the UCB1
+        exploration constant.  seed makes the rollouts reproducible.
+        """
+        self._time_budget = time_budget
+        self._rollout_rounds = rollout_rounds
+        self._exploration = exploration
+        self._dice = DiceStream(seed)
+        self.rollouts = 0
+        self.search_time = 0.0
+
+    def __call__(self, game, name, position):
+        """Buy policy interface.  Returns True if the named player should buy the space at position."""
+        return self.decide(game, name)
+
+    def rollouts_per_second(self):
+        """Returns the average number of rollouts played per second of search."""
+        if self.search_time == 0:
+            return 0.0
+        return self.rollouts / self.search_time
+
+    def decide(self, game, name):
+        """
+        Given the game and the name of the player whose turn it is, searches until the time budget runs out and
+        returns True if buying the current space has the better average rollout score.
+        """
+        position = game.get_player_current_position(name)
+        if game.get_owner(position) is not None or game.get_player_account_balance(name) <= \
+                game.get_purchase_price(position):
+            return False
+
+        stats = {BUY: [0, 0.0], PASS: [0, 0.0]}                 # Action to [visits, total score]
+        names = list(game.get_players())
+        next_seat = names.index(name) + 1
+        start = time.perf_counter()
+        deadline = start + self._time_budget
+        while True:
+            action = self._select(stats)
+            score = self._rollout(game, name, names, next_seat, action)
+            stats[action][0] += 1
+            stats[action][1] += score
+            self.rollouts += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.search_time += time.perf_counter() - start
+
+        return _mean(stats[BUY]) >= _mean(stats[PASS])
+
+    def _select(self, stats):
+        """Returns the action with the highest UCB1 value.  Untried actions are tried first."""
+        total = stats[BUY][0] + stats[PASS][0]
+        best = None
+        best_value = -1.0
+        for action in (BUY, PASS):
+            visits, score = stats[action]
+            if visits == 0:
+                return action
+            value = score / visits + self._exploration * math.sqrt(math.log(total) / visits)
+            if value > best_value:
+                best, best_value = action, value
+        return best
+
+    def _rollout(self, game, name, names, next_seat, action):
+        """
+        Plays the rest of the game from a clone after taking the action, with random dice and every player buying
+        every space they can, and returns the named player's score from 0 to 1.
+        """
+        clone = game.clone()
+        if action is BUY:
+            clone.buy_space(name)
+        winner, rounds = play_rounds(clone, names, [always_buy] * len(names), self._dice, self._rollout_rounds,
+                                     next_seat)
+        if winner is not None:
+            return 1.0 if winner == name else 0.0
+        return _net_worth_share(clone, name)
+
+
+def _mean(stat):
+    """Returns the average score of [visits, total score]."""
+    return stat[1] / stat[0] if stat[0] else 0.0
+
+
+def _net_worth_share(game, name):
+    """Returns the named player's share of the total balances plus property purchase prices of all players."""
+    worth = {}
+    for player, info in game.get_players().items():
+        worth[player] = info["Balance"] + sum(game.get_purchase_price(space) for space in info["Properties"])
+    total = sum(worth.values())
+    return worth[name] / total if total else 0.0
@@ -0,0 +1,97 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines functions that analyze a board configuration as a Markov chain.  A player's position after
+#              each roll of the single die depends only on their previous position, so the long-run probability of
+#              landing on each space can be computed exactly.  analyze_board uses the landing probabilities to report
+#              the expected rent per turn and the payback period of every property.  Results are cached by board
+#              configuration.
+from functools import lru_cache
+from RealEstateGame import RealEstateGame
+
+DIE_SIDES = 6
+
+
+def transition_matrix(num_spaces):
+    """
+    Given the number of spaces on the circular board, returns the transition matrix as a list of rows, where
+    matrix[i][j] is the probability of moving from space i to space j with one roll of the die.
+    """
+    matrix = [[0.0] * num_spaces for i in range(num_spaces)]
+    for position in range(num_spaces):
+        for number in range(1, DIE_SIDES + 1):
+            matrix[position][(position + number) % num_spaces] += 1 / DIE_SIDES
+    return matrix
+
+
+@lru_cache(maxsize=None)
+def stationary_distribution(num_spaces):
+    """
+    Given the number of spaces on the circular board, returns a tuple of the long-run probabilities of a player
+    being on each space.  Solves pi = pi * P with the probabilities summing to one by Gaussian elimination.
+    """
+    matrix = transition_matrix(num_spaces)
+
+    # Equations (P^T - I) pi = 0, with the last equation replaced by sum(pi) = 1.
+    rows = [[matrix[j][i] - (1 if i == j else 0) for j in range(num_spaces)] + [0.0] for i in range(num_spaces)]
+    rows[-1] = [1.0] * num_spaces + [1.0]
+
+    for col in range(num_spaces):
+        pivot = max(range(col, num_spaces), key=lambda row: abs(rows[row][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        pivot_row = rows[col]
+        for row in range(num_spaces):
+            if row != col and rows[row][col] != 0:
+                factor = rows[row][col] / pivot_row[col]
+                rows[row] = [a - factor * b for a, b in zip(rows[row], pivot_row)]
+
+    return tuple(rows[i][-1] / rows[i][i] for i in range(num_spaces))
+
+
+def go_probability(num_spaces):
+    """
+    Given the number of spaces on the circular board, returns the long-run probability that a turn lands on or passes
+    the GO space.
+    """
+    landing = stationary_distribution(num_spaces)
+    return sum(landing[position] * sum(1 for number in range(1, DIE_SIDES + 1) if position + number >= num_spaces)
+               for position in range(num_spaces)) / DIE_SIDES
+
+
+@lru_cache(maxsize=128)
+def _analyze(go_amount, rents, num_players):
+    """
+    Cached helper for analyze_board.  Given the GO amount, a tuple of rents, and the number of players, returns a
+    tuple of (GO bonus per turn, tuple of (position, name, probability, price, rent, rent per turn, payback)).
+    """
+    game = RealEstateGame(verbose=False)
+    game.create_spaces(go_amount, rents)
+    num_spaces = len(game.get_board().names)
+    landing = stationary_distribution(num_spaces)
+    bonus = game.get_board().bonus
+
+    properties = []
+    for position in range(1, num_spaces):
+        rent = game.get_rent(position)
+        price = game.get_purchase_price(position)
+        rent_per_turn = landing[position] * rent
+        # Every other player has one turn per round.
+        rent_per_round = rent_per_turn * (num_players - 1)
+        payback = price / rent_per_round if rent_per_round > 0 else float("inf")
+        properties.append((position, game.get_spaces_name(position), landing[position], price, rent, rent_per_turn,
+                           payback))
+    return go_probability(num_spaces) * bonus, tuple(properties)
+
+
+def analyze_board(go_amount=None, rent_list=None, num_players=2):
+    """
+    Given the parameters go_amount and rent_list of create_spaces and the number of players, returns a dictionary
+    with the expected "GO Bonus Per Turn" and "Properties", a dictionary keyed by space number of each property's
+    "Name", "Landing Probability", "Purchase", "Rent", "Rent Per Turn" (expected rent collected from one opponent
+    turn), and "Payback Rounds" (expected number of rounds for the rent from all opponents to repay the purchase
+    price).  Results are cached by board configuration.
+    """
+    go_bonus, properties = _analyze(go_amount, None if rent_list is None else tuple(rent_list), num_players)
+    return {"GO Bonus Per Turn": go_bonus,
+            "Properties": {position: {"Name": name, "Landing Probability": probability, "Purchase": price,
+                                      "Rent": rent, "Rent Per Turn": rent_per_turn, "Payback Rounds": payback}
+                           for position, name, probability, price, rent, rent_per_turn, payback in properties}}
@@ -0,0 +1,156 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class BatchGame which plays many Real Estate Games in lockstep using NumPy arrays.  Player
+#              positions, balances, space owners, and finished games are stored as arrays so that one round of dice
+#              rolls, GO bonuses, rent payments, purchases, and bankruptcies is applied to every game at once.  The
+#              rules mirror RealEstateGame's move_player, buy_space, pay_rent, and declare_bankruptcy methods.
+import numpy as np
+from RealEstateGame import RealEstateGame
+
+
+class BatchGame:
+    """
+    A class to represent a batch of Real Estate Games with the same board and number of players.  Players are
+    numbered 0 to num_players - 1 and take turns in that order.  Games that are over are masked out of later rounds.
+    """
+    def __init__(self, num_games, num_players, starting_balance=None, go_amount=None, rent_list=None, seed=None,
+                 num_spaces=None):
+        """
+        Creates a BatchGame object with num_games games of num_players players each.  starting_balance, go_amount,
+        rent_list, and num_spaces have the same defaults as create_player and create_spaces.  seed makes the dice
+        reproducible.
+        """
+        if starting_balance is None:
+            starting_balance = 1000
+
+        # Read the board from a RealEstateGame so both engines use the same spaces.
+        game = RealEstateGame(verbose=False)
+        game.create_spaces(go_amount, rent_list, num_spaces)
+        board = game.get_board()
+        self._num_spaces = len(board.names)
+        self._bonus = board.bonus
+        self._rent = np.array((0,) + board.rents[1:], dtype=np.int64)
+        self._price = np.array((0,) + board.prices[1:], dtype=np.int64)
+        # The GO space cannot be bought.
+        self._purchasable = np.arange(self._num_spaces) != 0
+
+        self._num_games = num_games
+        self._num_players = num_players
+        self._rng = np.random.default_rng(seed)
+
+        # Game state.  An owner of -1 means the space has no owner.
+        self._positions = np.zeros((num_games, num_players), dtype=np.int64)
+        self._balances = np.full((num_games, num_players), starting_balance, dtype=np.int64)
+        self._owners = np.full((num_games, self._num_spaces), -1, dtype=np.int16)
+        self._active = np.ones(num_games, dtype=bool)
+        self._winners = np.full(num_games, -1, dtype=np.int64)
+        self._rounds = np.zeros(num_games, dtype=np.int64)
+        self._check_game_over()
+
+    def get_positions(self):
+        """Returns the (num_games, num_players) array of player positions."""
+        return self._positions
+
+    def get_balances(self):
+        """Returns the (num_games, num_players) array of player account balances."""
+        return self._balances
+
+    def get_owners(self):
+        """Returns the (num_games, num_spaces) array of space owners.  -1 means no owner."""
+        return self._owners
+
+    def get_active(self):
+        """Returns the boolean array of games that are not over."""
+        return self._active
+
+    def get_winners(self):
+        """Returns the array of winning player numbers.  -1 if the game has no winner yet."""
+        return self._winners
+
+    def get_rounds(self):
+        """Returns the array of the number of rounds played in each game."""
+        return self._rounds
+
+    def set_position(self, game, player, position):
+        """For testing purposes, sets a player's position in the given game"""
+        self._positions[game, player] = position
+
+    def set_balance(self, game, player, balance):
+        """For testing purposes, sets a player's balance in the given game to designated amount"""
+        self._balances[game, player] = balance
+
+    def play_round(self, rolls=None, buy=None):
+        """
+        Plays one round in every game that is not over.  Given optional parameter rolls, a (num_games, num_players)
+        array of dice rolls (1-6), the rolls are used instead of random rolls.  Given optional parameter buy, a buy
+        policy called as buy(batch, player, games, positions) that returns a boolean array, players only buy the
+        spaces where it returns True.  By default players try to buy every unowned space they land on.
+        """
+        for player in range(self._num_players):
+            # Players with zero balance have lost the game and cannot move.
+            games = np.flatnonzero(self._active & (self._balances[:, player] != 0))
+            if len(games) == 0:
+                continue
+            if rolls is None:
+                number = self._rng.integers(1, 7, size=len(games))
+            else:
+                number = np.asarray(rolls)[games, player]
+
+            # Move players.  Players who land on or pass GO earn the GO bonus.
+            position = self._positions[games, player] + number
+            passed_go = position >= self._num_spaces
+            position[passed_go] -= self._num_spaces
+            self._balances[games[passed_go], player] += self._bonus
+            self._positions[games, player] = position
+
+            # Pay rent if the space is owned by another player.
+            owner = self._owners[games, position].astype(np.int64)
+            rent = self._rent[position]
+            balance = self._balances[games, player]
+            owes_rent = (owner >= 0) & (owner != player)
+            bankrupt = owes_rent & (balance <= rent)
+            pays = owes_rent & ~bankrupt
+            self._balances[games[pays], player] -= rent[pays]
+            self._balances[games[pays], owner[pays]] += rent[pays]
+            if bankrupt.any():
+                self._declare_bankruptcy(games[bankrupt], player, owner[bankrupt])
+
+            # Buy unowned spaces if the player's balance is greater than the purchase price.
+            can_buy = (owner == -1) & self._purchasable[position] & (self._balances[games, player] >
+                                                                      self._price[position])
+            if buy is not None and can_buy.any():
+                can_buy &= np.asarray(buy(self, player, games, position), dtype=bool)
+            buyers = games[can_buy]
+            self._owners[buyers, position[can_buy]] = player
+            self._balances[buyers, player] -= self._price[position[can_buy]]
+
+        self._rounds[self._active] += 1
+        self._check_game_over()
+
+    def run(self, max_rounds=1000, buy=None):
+        """
+        Plays rounds until every game is over or max_rounds rounds have been played.  Returns the array of winners.
+        """
+        while self._active.any() and self._rounds.max(initial=0) < max_rounds:
+            self.play_round(buy=buy)
+        return self._winners
+
+    def _declare_bankruptcy(self, games, player, owner):
+        """
+        Given the array of games, the player, and the array of space owners owed rent, pays each owner the player's
+        remaining balance, sets the player's balance to zero, and removes the player's properties.
+        """
+        self._balances[games, owner] += self._balances[games, player]
+        self._balances[games, player] = 0
+        owners = self._owners[games]
+        owners[owners == player] = -1
+        self._owners[games] = owners
+
+    def _check_game_over(self):
+        """
+        Marks games where all but one player have zero balances as over and records the winner.
+        """
+        solvent = self._balances != 0
+        over = self._active & (solvent.sum(axis=1) == 1)
+        self._winners[over] = np.argmax(solvent[over], axis=1)
+        self._active &= ~over
@@ -0,0 +1,172 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Benchmark suite for the Real Estate Game.  Measures single-turn latency, complete game throughput for
+#              2-10 players and different board sizes, turn latency on boards of 25 to 100,000 spaces, the cost of
+#              create_spaces, and peak memory for many live games.
+#              Results are saved as JSON so that runs from different commits can be compared:
+#                python benchmarks.py --output new.json --compare old.json
+import argparse
+import json
+import platform
+import subprocess
+import time
+import timeit
+import tracemalloc
+from RealEstateGame import RealEstateGame
+from compact_game import CompactRealEstateGame
+from simulation import simulate_game
+
+
+def bench_turn_latency(game_class=RealEstateGame, number=20000, repeat=5, num_spaces=25):
+    """
+    Returns the best average time in nanoseconds of one turn (move_player, then buy_space if the space is unowned)
+    in a two player game with a default board of num_spaces spaces.
+    """
+    game = game_class(verbose=False)
+    game.create_spaces(num_spaces=num_spaces)
+    game.create_player("Player 1", 10 ** 12)                   # Large balances so the game never ends
+    game.create_player("Player 2", 10 ** 12)
+    names = ["Player 1", "Player 2"]
+    numbers = [1, 4, 6, 2, 5, 3, 6, 1, 2]
+
+    def turns():
+        for i in range(number):
+            name = names[i & 1]
+            game.move_player(name, numbers[i % 9])
+            if game.get_owner(game.get_player_current_position(name)) is None:
+                game.buy_space(name)
+
+    return min(timeit.repeat(turns, number=1, repeat=repeat)) / number * 1e9
+
+
+def bench_game_throughput(player_counts=range(2, 11), board_sizes=(25, 1000), games=200):
+    """
+    Returns a dictionary keyed by "<players>x<spaces>" of complete headless games per second and rounds per second
+    for each number of players and board size.
+    """
+    results = {}
+    for num_spaces in board_sizes:
+        for num_players in player_counts:
+            start = time.perf_counter()
+            rounds = 0
+            for seed in range(games):
+                rounds += simulate_game(num_players, seed=seed, num_spaces=num_spaces).rounds
+            elapsed = time.perf_counter() - start
+            results[str(num_players) + "x" + str(num_spaces)] = {"Games Per Second": games / elapsed,
+                                                                 "Rounds Per Second": rounds / elapsed}
+    return results
+
+
+def bench_board_scaling(game_class=RealEstateGame, board_sizes=(25, 1000, 100000), number=20000):
+    """
+    Returns a dictionary keyed by board size of the turn latency in nanoseconds and the time in milliseconds to
+    create the board, to check that turn cost does not grow with the board.
+    """
+    results = {}
+    for num_spaces in board_sizes:
+        start = time.perf_counter()
+        game_class(verbose=False).create_spaces(num_spaces=num_spaces)
+        create = (time.perf_counter() - start) * 1000
+        results[str(num_spaces)] = {"Turn Nanoseconds": bench_turn_latency(game_class, number, num_spaces=num_spaces),
+                                    "Create Spaces Milliseconds": create}
+    return results
+
+
+def bench_create_spaces(game_class=RealEstateGame, number=2000, repeat=5):
+    """Returns the best average time in microseconds of creating a game and calling create_spaces."""
+    def create():
+        game_class(verbose=False).create_spaces()
+    return min(timeit.repeat(create, number=number, repeat=repeat)) / number * 1e6
+
+
+def bench_memory(game_class=RealEstateGame, count=10000, num_players=4):
+    """
+    Returns the peak memory in bytes, as measured by tracemalloc, of keeping count live games with the default board
+    and num_players players, and the peak memory per game.
+    """
+    tracemalloc.start()
+    try:
+        games = []
+        for i in range(count):
+            game = game_class(verbose=False)
+            game.create_spaces()
+            for player in range(num_players):
+                game.create_player("Player " + str(player + 1))
+            games.append(game)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"Peak Bytes": peak, "Bytes Per Game": peak / count}
+
+
+def git_commit():
+    """Returns the current git commit hash, or None if it cannot be found."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scale=1.0):
+    """
+    Runs every benchmark and returns the results dictionary.  scale multiplies the number of repetitions (use a
+    small scale for a quick check).
+    """
+    def scaled(number):
+        return max(1, int(number * scale))
+
+    results = {"Commit": git_commit(), "Python": platform.python_version(), "Time": time.time()}
+    for game_class in (RealEstateGame, CompactRealEstateGame):
+        results[game_class.__name__] = {
+            "Turn Nanoseconds": bench_turn_latency(game_class, number=scaled(20000)),
+            "Create Spaces Microseconds": bench_create_spaces(game_class, number=scaled(2000)),
+            "Memory": bench_memory(game_class, count=scaled(10000)),
+            "Board Scaling": bench_board_scaling(game_class, number=scaled(20000)),
+        }
+    results["Games"] = bench_game_throughput(games=scaled(200))
+    return results
+
+
+def flatten(results, prefix=""):
+    """Returns a dictionary of the numbers in nested results dictionaries keyed by "/"-joined paths."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + "/"))
+        elif isinstance(value, (int, float)) and key != "Time":
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(old, new):
+    """
+    Given old and new results dictionaries, returns a list of (benchmark, old value, new value, percent change).
+    """
+    old, new = flatten(old), flatten(new)
+    return [(key, old[key], new[key], (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0)
+            for key in new if key in old]
+
+
+def main():
+    """Runs the benchmarks, saves the results as JSON, and optionally compares them to earlier results."""
+    parser = argparse.ArgumentParser(description="Real Estate Game benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json", help="file to save the results to")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the number of repetitions")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scale)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print("Results saved to " + args.output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            old = json.load(file)
+        for key, old_value, new_value, change in compare(old, results):
+            print("%-60s %14.2f %14.2f %+7.1f%%" % (key, old_value, new_value, change))
+
+
+if __name__ == '__main__':
+    main()
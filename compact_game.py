@@ -0,0 +1,343 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class CompactRealEstateGame, a memory-compact version of RealEstateGame with the same public
+#              methods.  Instead of a dictionary per space and per player, the board is stored in tuples shared by
+#              all games with the same configuration, and the game state is stored in arrays indexed by space number
+#              and player number.  Balances are stored as 64-bit integers, so unlike RealEstateGame, balances must be
+#              integers.  Also defines measure_memory_per_game to compare the two representations.
+import operator
+import tracemalloc
+from array import array
+from types import MappingProxyType
+from RealEstateGame import board_template, GameSnapshot
+from sinks import NullSink, PrintSink
+
+# Owner codes stored in the owners array
+NO_OWNER = -1
+GO_SPACE = -2
+
+
+def integer_balance(balance):
+    """
+    Returns balance as an int for the 64-bit balance arrays.  Raises ValueError if it is not an integer.
+    """
+    try:
+        return operator.index(balance)
+    except TypeError:
+        raise ValueError("CompactRealEstateGame balances must be integers.") from None
+
+
+class CompactRealEstateGame:
+    """
+    A class to represent the Real Estate Game with a compact array-based game state.  Players are numbered in the
+    order they are created.
+    """
+    __slots__ = ("_names", "_rents", "_prices", "_bonus", "_owners", "_ids", "_player_names", "_positions",
+                 "_balances", "_properties", "_sink", "_solvent", "_on_game_over", "_owned_rent")
+
+    def __init__(self, verbose=True, sink=None):
+        """
+        Creates a CompactRealEstateGame object with no spaces or players.  Game messages are sent to sink.  If no
+        sink is given, messages are printed, or discarded if verbose is False.
+        """
+        self._names = ()
+        self._rents = ()
+        self._prices = ()
+        self._bonus = 0
+        self._owners = array("h")
+        self._ids = {}                                          # Player name to player number
+        self._player_names = []                                 # Player number to player name
+        self._positions = array("l")
+        self._balances = array("q")
+        self._properties = []                                   # Player number to list of owned spaces
+        self._sink = None
+        self.set_sink(sink if sink is not None or not verbose else PrintSink())
+        self._solvent = set()                                   # Numbers of players with nonzero balances
+        self._owned_rent = array("q")                           # Player number to total rent of their properties
+        self._on_game_over = None
+
+    def create_spaces(self, go_amount=None, rent_list=None, num_spaces=None):
+        """
+        Given parameter go_amount, the amount of money earned when a player passes or lands on GO space, and parameter
+        rent_list, a list of rents for the other spaces, create_spaces sets up the game spaces including the GO space.
+        If rent_list is not given, the board has num_spaces spaces (default 25) with the default rents.  Like
+        RealEstateGame, the board tuples come from a BoardTemplate shared with other games.  Raises ValueError if the
+        board would have fewer than 6 spaces.
+        """
+        if go_amount is None:
+            go_amount = 100
+
+        if rent_list is None:
+            board = board_template(go_amount, None, 25 if num_spaces is None else num_spaces)
+        else:
+            board = board_template(go_amount, tuple(rent_list))
+        self._names, self._prices, self._rents, self._bonus = board
+        self._owners = array("h", [NO_OWNER]) * len(self._names)
+        self._owners[0] = GO_SPACE
+        return
+
+    def create_player(self, name, starting_balance=None):
+        """
+        Given parameter name, the unique player name, and parameter starting_balance, the initial starting amount of
+        money, create_player adds a player at the GO space.  Returns False if name is not unique, otherwise True.
+        Raises ValueError if starting_balance is not an integer (balances are stored as 64-bit integers).
+        """
+        if starting_balance is None:
+            starting_balance = 1000
+
+        if name in self._ids:
+            return False
+        starting_balance = integer_balance(starting_balance)
+
+        self._ids[name] = len(self._player_names)
+        self._player_names.append(name)
+        self._positions.append(0)
+        self._balances.append(starting_balance)
+        self._properties.append([])
+        self._owned_rent.append(0)
+        if starting_balance != 0:
+            self._solvent.add(self._ids[name])
+        return True
+
+    def get_player_account_balance(self, name):
+        """
+        Returns the given player's account balance. Returns 'Invalid player' if player's name does not exist.
+        """
+        if name not in self._ids:
+            return "Invalid player."
+        return self._balances[self._ids[name]]
+
+    def get_player_current_position(self, name):
+        """
+        Returns the given player's current position as an integer from 0 to the number of spaces - 1, where 0
+        represents the GO space.
+        Returns 'Invalid player' if player's name does not exist.
+        """
+        if name not in self._ids:
+            return "Invalid player."
+        return self._positions[self._ids[name]]
+
+    def get_players(self):
+        """
+        Returns a read-only player dictionary in the same form as RealEstateGame.get_players: name, account balance,
+        position, and properties owned.  Unlike RealEstateGame, it is a copy that does not follow the game, and
+        changing it (including the property lists) does not change the game.
+        """
+        return MappingProxyType({name: {"Position": self._positions[player], "Balance": self._balances[player],
+                                        "Properties": list(self._properties[player])}
+                                 for player, name in enumerate(self._player_names)})
+
+    def snapshot(self):
+        """Returns a GameSnapshot of every player's name, position, balance, and properties in one call."""
+        return GameSnapshot(tuple(self._player_names), tuple(self._positions), tuple(self._balances),
+                            tuple(map(tuple, self._properties)))
+
+    def get_spaces(self):
+        """
+        Returns a new spaces dictionary in the same form as RealEstateGame.get_spaces: name, purchase amount, rent,
+        and owner.  Returns an empty dictionary if create_spaces has not been called.
+        """
+        if not self._names:
+            return {}
+        spaces = {0: {"Name": self._names[0], "Purchase": False, "Bonus": self._bonus, "Owner": False}}
+        for position in range(1, len(self._names)):
+            spaces[position] = {"Name": self._names[position], "Purchase": self._prices[position],
+                                "Rent": self._rents[position], "Owner": self.get_owner(position)}
+        return spaces
+
+    def get_spaces_name(self, position):
+        """Returns the name of the given space"""
+        return self._names[position]
+
+    def get_properties(self, player):
+        """Returns all the properties for the given player name"""
+        return self._properties[self._ids[player]]
+
+    def get_property_count(self, name):
+        """Returns the number of properties owned by the given player name"""
+        return len(self._properties[self._ids[name]])
+
+    def get_total_rent(self, name):
+        """Returns the total rent of all the properties owned by the given player name"""
+        return self._owned_rent[self._ids[name]]
+
+    def owns(self, name, position):
+        """Returns True if the given player name owns the given space"""
+        player = self._ids.get(name)
+        if player is None:
+            return False
+        return self._owners[position] == player
+
+    def get_rent(self, position):
+        """Returns the rent price for the given space"""
+        return self._rents[position]
+
+    def get_purchase_price(self, position):
+        """Returns purchase price for the given position"""
+        return self._prices[position]
+
+    def get_owner(self, position):
+        """Returns owner of space"""
+        owner = self._owners[position]
+        if owner == NO_OWNER:
+            return None
+        if owner == GO_SPACE:
+            return False
+        return self._player_names[owner]
+
+    def set_position(self, name, position):
+        """For testing purposes, sets a player's position on designated space"""
+        self._positions[self._ids[name]] = position
+
+    def set_balance(self, name, balance):
+        """For testing purposes, sets a player's balance to designated amount (an integer)"""
+        self._balances[self._ids[name]] = integer_balance(balance)
+        self._update_solvent(self._ids[name])
+
+    def set_sink(self, sink):
+        """
+        Sets the sink that receives game messages.  None or a NullSink discards messages without any cost.
+        """
+        self._sink = None if sink is None or isinstance(sink, NullSink) else sink
+
+    def set_game_over_callback(self, callback):
+        """
+        Sets a function to be called with the winning player's name as soon as all but one player have zero balances.
+        None removes the callback.
+        """
+        self._on_game_over = callback
+
+    def _update_solvent(self, player):
+        """
+        Updates the set of players with nonzero balances after the given player number's balance has changed, and
+        calls the game over callback if the change ended the game.
+        """
+        was_over = len(self._solvent) == 1
+        if self._balances[player] == 0:
+            self._solvent.discard(player)
+        else:
+            self._solvent.add(player)
+
+        if len(self._solvent) == 1 and not was_over and self._on_game_over is not None:
+            self._on_game_over(self._player_names[next(iter(self._solvent))])
+
+    def buy_space(self, name):
+        """
+        Given the player's name, buy_space returns True if the player purchases the space and False if the player cannot
+        make the purchase. If the player's name does not exist, buy_space returns 'invalid player.'
+        """
+        if name not in self._ids:
+            return "Invalid player."
+
+        player = self._ids[name]
+        space = self._positions[player]
+        if self._owners[space] == NO_OWNER and self._balances[player] > self._prices[space]:
+            self._owners[space] = player
+            self._balances[player] -= self._prices[space]
+            self._properties[player].append(space)
+            self._owned_rent[player] += self._rents[space]
+            return True
+        return False
+
+    def pay_rent(self, name, position, owner):
+        """
+        Helper method for move_player.  Given the player's name, current position, and owner of the space, pay_rent
+        deducts the rent price from the player's balance and pays the amount to the space owner. If the player's balance
+        is less than or equal to the rent payment, pay_rent calls declare_bankruptcy method.
+        """
+        player = self._ids[name]
+        payment = self._rents[position]
+        if self._balances[player] <= payment:
+            if self._sink is not None:
+                self._sink.emit("bankruptcy", "Oh no!  You must declare bankruptcy and forfeit all property",
+                                name=name, owner=owner, amount=self._balances[player])
+            self.declare_bankruptcy(name, owner)
+            return
+
+        self._balances[player] -= payment
+        self._balances[self._ids[owner]] += payment
+        if self._ids[owner] not in self._solvent:
+            self._update_solvent(self._ids[owner])
+        return
+
+    def declare_bankruptcy(self, name, owner):
+        """
+        Helper method for pay_rent.  Given the player's name and the owner of the space, declare_bankruptcy
+        pays the owner the entirety of the player's balance, sets the player's balance to zero, and
+        removes all properties from the player's property list.
+        """
+        player = self._ids[name]
+        self._balances[self._ids[owner]] += self._balances[player]
+        self._balances[player] = 0
+        self._update_solvent(self._ids[owner])
+        self._update_solvent(player)
+
+        properties = self._properties[player]
+        for space in properties:
+            self._owners[space] = NO_OWNER
+        properties.clear()
+        self._owned_rent[player] = 0
+        return
+
+    def move_player(self, name, number):
+        """
+        Given the player's name and the number of spaces to move [1-6], move_player moves active players the specified
+        amount around the game board and calls pay_rent if the space is owned by another player.  If number is not
+        1-6, move_player returns 'Invalid move.'  If player name does not exist, move_player returns 'Invalid player.'
+        """
+        if number < 1 or number > 6:
+            return "Invalid move."
+
+        if name not in self._ids:
+            return "Invalid player."
+
+        player = self._ids[name]
+        if self._balances[player] == 0:
+            if self._sink is not None:
+                self._sink.emit("zero_balance", "Zero balance. :(  Next player's turn!", name=name)
+            return
+
+        # Player lands on or passes GO.
+        position = self._positions[player] + number
+        if position >= len(self._names):
+            self._balances[player] += self._bonus
+            if self._sink is not None:
+                self._sink.emit("go_bonus", "Go Bonus: $" + str(self._bonus) + "!", name=name, amount=self._bonus)
+            if self._balances[player] == 0:
+                self._update_solvent(player)
+            position -= len(self._names)
+        self._positions[player] = position
+
+        owner = self._owners[position]
+        if owner >= 0 and owner != player:
+            self.pay_rent(name, position, self._player_names[owner])
+        return
+
+    def check_game_over(self):
+        """
+        Returns the winning player's name if all but one player have zero balances.  Otherwise, returns False.
+        """
+        if len(self._solvent) == 1:
+            return self._player_names[next(iter(self._solvent))]
+        return False
+
+
+def measure_memory_per_game(game_class, count=1000, num_players=4):
+    """
+    Given a game class, creates count games with the default board and num_players players each and returns the
+    average number of bytes of memory allocated per game, as measured by tracemalloc.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        games = []
+        for i in range(count):
+            game = game_class(verbose=False)
+            game.create_spaces()
+            for player in range(num_players):
+                game.create_player("Player " + str(player + 1))
+            games.append(game)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / count
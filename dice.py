@@ -0,0 +1,69 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines dice sources for the Real Estate Game.  A dice source is an iterable of rolls from 1 to 6 with a
+#              roll method for one roll at a time.  DiceStream generates rolls a block at a time from random bytes,
+#              NumpyDice generates them with a NumPy Generator, and RecordedDice replays a fixed list of rolls so
+#              that games can be played deterministically.  Game loops take rolls with next() on the iterator, so
+#              each roll costs no Python function call.
+import random
+from itertools import chain, islice
+
+# Bytes 0-251 map to rolls 1-6 (42 bytes per face).  Bytes 252-255 are rejected so every face is equally likely.
+_ROLL_TABLE = bytes(byte % 6 + 1 for byte in range(256))
+_REJECTED = bytes(range(252, 256))
+
+
+class DiceStream:
+    """
+    A class to represent a seedable stream of fair dice rolls generated block_size random bytes at a time.
+    """
+    def __init__(self, seed=None, block_size=4096):
+        """Creates a DiceStream.  The same seed always gives the same rolls."""
+        self._rng = random.Random(seed)
+        self._block_size = block_size
+        self._rolls = chain.from_iterable(iter(self._next_block, None))
+
+    def _next_block(self):
+        """Returns the next block of rolls as bytes."""
+        return self._rng.randbytes(self._block_size).translate(_ROLL_TABLE, _REJECTED)
+
+    def __iter__(self):
+        """Returns the endless iterator of rolls."""
+        return self._rolls
+
+    def roll(self):
+        """Returns the next roll."""
+        return next(self._rolls)
+
+    def rolls(self, count):
+        """Returns a list of the next count rolls."""
+        return list(islice(self._rolls, count))
+
+
+class NumpyDice(DiceStream):
+    """
+    A class to represent a seedable stream of dice rolls generated by a NumPy Generator.  Requires NumPy.
+    """
+    def __init__(self, seed=None, block_size=4096):
+        """Creates a NumpyDice stream.  The same seed always gives the same rolls."""
+        import numpy as np
+        self._rng = np.random.default_rng(seed)
+        self._block_size = block_size
+        self._rolls = chain.from_iterable(iter(self._next_block, None))
+
+    def _next_block(self):
+        """Returns the next block of rolls as a list."""
+        return self._rng.integers(1, 7, size=self._block_size).tolist()
+
+
+class RecordedDice(DiceStream):
+    """
+    A class to represent a recorded sequence of dice rolls.  Game loops stop when the recorded rolls run out.
+    """
+    def __init__(self, rolls):
+        """Creates a RecordedDice object from a list of rolls.  Raises ValueError if a roll is not 1-6."""
+        rolls = list(rolls)
+        for number in rolls:
+            if number < 1 or number > 6:
+                raise ValueError("Dice rolls must be 1-6.")
+        self._rolls = iter(rolls)
@@ -0,0 +1,317 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines a randomized differential test harness that checks that the fast engines play exactly the same
+#              rules as RealEstateGame's move_player, buy_space, pay_rent, and declare_bankruptcy.  Random cases (a
+#              board, players, seeded dice rolls, and buy decisions) are played by the reference game and by each
+#              engine, and the full game state is compared after every turn (after every round for the batch
+#              engine, which plays whole rounds).  A divergence is shrunk to a minimal case that still diverges.
+#              Run "python differential.py --cases 10000" for a long run.
+import argparse
+import random
+import time
+from collections import namedtuple
+from RealEstateGame import RealEstateGame
+from compact_game import CompactRealEstateGame
+from solver import ExpectimaxSolver
+
+try:
+    from batch_engine import BatchGame
+except ImportError:                                         # NumPy is optional and only needed for the batch engine
+    BatchGame = None
+
+# A differential test case.  Turn t is played by player t % num_players with rolls[t], and decisions[t] says whether
+# the player buys the space if they land on an unowned space they can afford.  Play stops at the end of the round in
+# which the game is over.
+Case = namedtuple("Case", ["num_players", "starting_balance", "go_amount", "rent_list", "rolls", "decisions"])
+
+# A divergence between the reference game and an engine: the engine's name, the case, the turn after which the states
+# differ, and the reference and engine states.  States are (positions, balances, owners) tuples by player number and
+# space number.  An owner of -1 means no owner, and players with zero balance are shown at position 0.
+Divergence = namedtuple("Divergence", ["engine", "case", "turn", "expected", "actual"])
+
+
+def random_case(seed, rounds=50):
+    """
+    Returns a random Case for the seed: 2-4 players, a board of 6-31 spaces with rents from 0 to 150, a GO amount from
+    0 to 200, a starting balance from 50 to 1500, and rounds rounds of dice rolls and buy decisions.  Small balances
+    make purchases, rent, and bankruptcies all common.
+    """
+    rng = random.Random(seed)
+    num_players = rng.randint(2, 4)
+    rent_list = [rng.randint(0, 150) for _ in range(rng.randint(5, 30))]
+    turns = rounds * num_players
+    return Case(num_players, rng.randint(50, 1500), rng.randint(0, 200), rent_list,
+                [rng.randint(1, 6) for _ in range(turns)], [rng.random() < 0.7 for _ in range(turns)])
+
+
+def _new_game(game_class, case):
+    """Returns a silent game of the given class set up for the case, and the list of player names."""
+    game = game_class(verbose=False)
+    game.create_spaces(case.go_amount, case.rent_list)
+    names = ["Player " + str(player + 1) for player in range(case.num_players)]
+    for name in names:
+        game.create_player(name, case.starting_balance)
+    return game, names
+
+
+def _snapshot_state(snapshot, num_spaces):
+    """Returns the state of a GameSnapshot (see Divergence)."""
+    owners = [-1] * num_spaces
+    for player, properties in enumerate(snapshot.properties):
+        for space in properties:
+            owners[space] = player
+    return (tuple(position if balance != 0 else 0 for position, balance in zip(snapshot.positions, snapshot.balances)),
+            snapshot.balances, tuple(owners))
+
+
+def trace_game(game_class, case):
+    """
+    Plays the case with move_player and buy_space on a game of the given class and returns the list of
+    (turn, state) after every turn.
+    """
+    game, names = _new_game(game_class, case)
+    num_spaces = len(case.rent_list) + 1
+    trace = []
+    for turn, number in enumerate(case.rolls):
+        name = names[turn % case.num_players]
+        game.move_player(name, number)
+        position = game.get_player_current_position(name)
+        if case.decisions[turn] and game.get_player_account_balance(name) != 0 and game.get_owner(position) is None:
+            game.buy_space(name)
+        trace.append((turn, _snapshot_state(game.snapshot(), num_spaces)))
+        if turn % case.num_players == case.num_players - 1 and game.check_game_over():
+            break
+    return trace
+
+
+def trace_reference(case):
+    """Plays the case with RealEstateGame's public methods and returns the list of (turn, state) after every turn."""
+    return trace_game(RealEstateGame, case)
+
+
+def trace_compact(case):
+    """Plays the case with CompactRealEstateGame and returns the list of (turn, state) after every turn."""
+    return trace_game(CompactRealEstateGame, case)
+
+
+def trace_move_many(case):
+    """
+    Plays the case one turn at a time with RealEstateGame.move_many, which uses the inline turn loop, and returns
+    the list of (turn, state) after every turn.
+    """
+    game, names = _new_game(RealEstateGame, case)
+    num_spaces = len(case.rent_list) + 1
+    trace = []
+    for turn, number in enumerate(case.rolls):
+        game.move_many(names[turn % case.num_players], (number,), case.decisions[turn:turn + 1])
+        trace.append((turn, _snapshot_state(game.snapshot(), num_spaces)))
+        if turn % case.num_players == case.num_players - 1 and game.check_game_over():
+            break
+    return trace
+
+
+def trace_solver(case):
+    """
+    Plays the case with the state transitions of ExpectimaxSolver.move and returns the list of (turn, state) after
+    every turn.
+    """
+    game, names = _new_game(RealEstateGame, case)
+    solver = ExpectimaxSolver()
+    names, (turn, positions, balances, owners) = solver._load(game)
+    prices = game.get_board().prices
+    trace = []
+    for turn, number in enumerate(case.rolls):
+        player = turn % case.num_players
+        positions, balances, owners, can_buy = solver.move(player, positions, balances, owners, number)
+        if can_buy and case.decisions[turn]:
+            position = positions[player]
+            balances = balances[:player] + (balances[player] - prices[position],) + balances[player + 1:]
+            owners = owners[:position] + (player,) + owners[position + 1:]
+        trace.append((turn, (positions, balances, owners)))
+        if player == case.num_players - 1 and sum(balance != 0 for balance in balances) == 1:
+            break
+    return trace
+
+
+def trace_batch_many(cases):
+    """
+    Plays cases with the same players, starting balance, GO amount, rents, and number of rounds as the games of one
+    BatchGame and returns the list of (turn, state) after every round for each case.
+    """
+    first = cases[0]
+    num_players = first.num_players
+    rounds = len(first.rolls) // num_players
+    batch = BatchGame(len(cases), num_players, first.starting_balance, first.go_amount, first.rent_list)
+    rolls = [[case.rolls[round_number * num_players:(round_number + 1) * num_players] for case in cases]
+             for round_number in range(rounds)]
+    decisions = [[case.decisions[round_number * num_players:(round_number + 1) * num_players] for case in cases]
+                 for round_number in range(rounds)]
+    traces = [[] for _ in cases]
+    for round_number in range(rounds):
+        active = batch.get_active().tolist()
+
+        def buy(batch, player, games, positions):
+            return [decisions[round_number][game][player] for game in games.tolist()]
+
+        batch.play_round(rolls[round_number], buy)
+        turn = (round_number + 1) * num_players - 1
+        positions = batch.get_positions().tolist()
+        balances = batch.get_balances().tolist()
+        owners = batch.get_owners().tolist()
+        for game, trace in enumerate(traces):
+            if active[game]:
+                trace.append((turn, (tuple(position if balance != 0 else 0
+                                           for position, balance in zip(positions[game], balances[game])),
+                                     tuple(balances[game]), tuple(owners[game]))))
+    return traces
+
+
+def trace_batch(case):
+    """Plays the case with BatchGame and returns the list of (turn, state) after every round."""
+    return trace_batch_many([case])[0]
+
+
+# Engines compared with the reference game
+ENGINES = {"compact": trace_compact, "move_many": trace_move_many, "solver": trace_solver}
+if BatchGame is not None:
+    ENGINES["batch"] = trace_batch
+
+
+def compare(expected, actual):
+    """
+    Given the reference trace and an engine's trace of the same case, returns (turn, expected state, actual state)
+    for the first turn where the states differ, or None if they agree everywhere the engine was checked.
+    """
+    states = dict(expected)
+    last = expected[-1][0] if expected else -1
+    for turn, state in actual:
+        if turn > last:
+            return turn, None, state                        # The engine played on after the game was over
+        if states[turn] != state:
+            return turn, states[turn], state
+    if actual and actual[-1][0] < last:
+        return actual[-1][0], None, None                    # The engine stopped before the game was over
+    return None
+
+
+def check_case(engine, case, trace=None):
+    """
+    Plays the case with the reference game and the named engine (or an engine function) and returns a Divergence,
+    or None if the engine agrees.  trace is the engine's trace if it has already been played.
+    """
+    function = ENGINES[engine] if isinstance(engine, str) else engine
+    difference = compare(trace_reference(case), function(case) if trace is None else trace)
+    if difference is None:
+        return None
+    return Divergence(engine, case, *difference)
+
+
+def _truncate(case, rounds):
+    """Returns the case with only its first rounds rounds."""
+    turns = rounds * case.num_players
+    return case._replace(rolls=case.rolls[:turns], decisions=case.decisions[:turns])
+
+
+def shrink(divergence):
+    """
+    Given a Divergence, returns a Divergence for a minimal case that still diverges: rounds after the divergence are
+    dropped, then whole earlier rounds are removed, rolls are lowered, and buy decisions are turned off for as long
+    as the engine still disagrees with the reference game.
+    """
+    engine = divergence.engine
+    best = divergence
+    case = _truncate(best.case, best.turn // best.case.num_players + 1)
+    best = check_case(engine, case) or best
+
+    changed = True
+    while changed:
+        changed = False
+        num_players = best.case.num_players
+        # Remove whole rounds, so every roll stays with the same player.
+        round_number = 0
+        while round_number < len(best.case.rolls) // num_players:
+            start, stop = round_number * num_players, (round_number + 1) * num_players
+            case = best.case._replace(rolls=best.case.rolls[:start] + best.case.rolls[stop:],
+                                      decisions=best.case.decisions[:start] + best.case.decisions[stop:])
+            found = case.rolls and check_case(engine, case)
+            if found:
+                best = found._replace(case=_truncate(case, found.turn // num_players + 1))
+                changed = True
+            else:
+                round_number += 1
+        # Lower rolls and turn off purchases.
+        for turn in range(len(best.case.rolls)):
+            for number in range(1, best.case.rolls[turn]):
+                rolls = best.case.rolls[:turn] + [number] + best.case.rolls[turn + 1:]
+                found = check_case(engine, best.case._replace(rolls=rolls))
+                if found:
+                    best = found
+                    changed = True
+                    break
+            if best.case.decisions[turn]:
+                decisions = best.case.decisions[:turn] + [False] + best.case.decisions[turn + 1:]
+                found = check_case(engine, best.case._replace(decisions=decisions))
+                if found:
+                    best = found
+                    changed = True
+    return best
+
+
+def run_differential(num_cases=100, rounds=50, seed=0, engines=None, batch_size=64):
+    """
+    Plays num_cases random cases (see random_case) of rounds rounds with the reference game and every engine in
+    engines (default all of ENGINES) and returns a dictionary with the number of "Cases" and reference "Turns"
+    played, and the list of shrunk "Divergences", at most one per engine.
+    """
+    if engines is None:
+        engines = list(ENGINES)
+    divergences = {}
+    turns = 0
+    for first in range(0, num_cases, batch_size):
+        cases = [random_case(seed * 1000003 + index, rounds) for index in range(first, min(first + batch_size,
+                                                                                            num_cases))]
+        references = [trace_reference(case) for case in cases]
+        turns += sum(len(reference) for reference in references)
+        for engine in engines:
+            if engine in divergences:
+                continue
+            if engine == "batch" and ENGINES.get(engine) is trace_batch:
+                # The batch engine plays cases with the same board together, so give every case in the group the
+                # first case's board and players.
+                board = cases[0]
+                length = min(len(case.rolls) for case in cases) // board.num_players * board.num_players
+                group = [board._replace(rolls=case.rolls[:length], decisions=case.decisions[:length])
+                         for case in cases]
+                traces = zip(group, trace_batch_many(group))
+                pairs = [(case, trace_reference(case), trace) for case, trace in traces]
+            else:
+                pairs = [(case, reference, ENGINES[engine](case)) for case, reference in zip(cases, references)]
+            for case, reference, trace in pairs:
+                difference = compare(reference, trace)
+                if difference is not None:
+                    divergences[engine] = shrink(Divergence(engine, case, *difference))
+                    break
+    return {"Cases": num_cases, "Turns": turns, "Divergences": list(divergences.values())}
+
+
+def main():
+    """Runs the differential harness and prints the number of turns checked and any shrunk divergences."""
+    parser = argparse.ArgumentParser(description="Real Estate Game differential engine tests")
+    parser.add_argument("--cases", type=int, default=1000, help="number of random cases")
+    parser.add_argument("--rounds", type=int, default=50, help="rounds per case")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random cases")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_differential(args.cases, args.rounds, args.seed)
+    print("%d cases, %d turns checked against %s in %.1f s" % (results["Cases"], results["Turns"],
+                                                               ", ".join(ENGINES), time.perf_counter() - start))
+    for divergence in results["Divergences"]:
+        print(divergence.engine + " diverges after turn " + str(divergence.turn) + ":")
+        print("  case:", divergence.case)
+        print("  expected:", divergence.expected)
+        print("  actual:  ", divergence.actual)
+
+
+if __name__ == '__main__':
+    main()
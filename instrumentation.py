@@ -0,0 +1,127 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class Instrumentation, an opt-in layer that counts calls and measures time spent in the hot
+#              methods of a RealEstateGame (move_player, pay_rent, buy_space, and declare_bankruptcy) and tracks the
+#              game economy: rent transferred, GO bonuses paid, purchases, and bankruptcies per round.  Games that are
+#              not attached run their methods unchanged, so instrumentation costs nothing when it is disabled.
+import time
+from collections import Counter
+
+METHODS = ("move_player", "pay_rent", "buy_space", "declare_bankruptcy")
+
+
+class Instrumentation:
+    """
+    A class to represent counters and timing histograms for one or more instrumented games.  Timing histograms have
+    power-of-two buckets: a call taking t nanoseconds is counted in the bucket for the smallest power of two above t.
+    """
+    def __init__(self):
+        """Creates an Instrumentation object with all counters at zero."""
+        self.reset()
+
+    def reset(self):
+        """Sets all counters and histograms back to zero."""
+        self.calls = Counter()
+        self.nanoseconds = Counter()
+        self.histograms = {method: Counter() for method in METHODS}
+        self.rent_transferred = 0
+        self.go_bonuses = 0
+        self.go_bonus_amount = 0
+        self.purchases = 0
+        self.purchase_amount = 0
+        self.bankruptcies = Counter()                           # Round number to number of bankruptcies
+
+    def attach(self, game):
+        """
+        Instruments the game by replacing its hot methods with timed versions on the game object.  Internal calls
+        (for example move_player calling pay_rent) go through the timed versions too.  Players and the board are
+        looked up on each call, so they may change after attaching.  Rounds are counted from the turn order: a new
+        round starts when a player moves again, so bankruptcies are counted per round of the attached game.
+        """
+        clock = time.perf_counter_ns
+        move_player = game.move_player
+        pay_rent = game.pay_rent
+        buy_space = game.buy_space
+        declare_bankruptcy = game.declare_bankruptcy
+        moved = set()                                           # Players who have moved in the current round
+        current_round = 1
+
+        def timed_move_player(name, number):
+            nonlocal current_round
+            info = game.get_players().get(name)
+            if info is not None and 1 <= number <= 6 and info["Balance"] != 0:
+                if name in moved:
+                    current_round += 1
+                    moved.clear()
+                moved.add(name)
+                board = game.get_board()
+                if info["Position"] + number >= len(board.names):
+                    self.go_bonuses += 1
+                    self.go_bonus_amount += board.bonus
+            start = clock()
+            result = move_player(name, number)
+            self._record("move_player", clock() - start)
+            return result
+
+        def timed_pay_rent(name, position, owner):
+            balance = game.get_player_account_balance(name)
+            start = clock()
+            result = pay_rent(name, position, owner)
+            self._record("pay_rent", clock() - start)
+            self.rent_transferred += balance - game.get_player_account_balance(name)
+            return result
+
+        def timed_buy_space(name):
+            start = clock()
+            result = buy_space(name)
+            self._record("buy_space", clock() - start)
+            if result is True:
+                self.purchases += 1
+                self.purchase_amount += game.get_purchase_price(game.get_player_current_position(name))
+            return result
+
+        def timed_declare_bankruptcy(name, owner):
+            start = clock()
+            result = declare_bankruptcy(name, owner)
+            self._record("declare_bankruptcy", clock() - start)
+            self.bankruptcies[current_round] += 1
+            return result
+
+        game.move_player = timed_move_player
+        game.pay_rent = timed_pay_rent
+        game.buy_space = timed_buy_space
+        game.declare_bankruptcy = timed_declare_bankruptcy
+
+    @staticmethod
+    def detach(game):
+        """Removes the timed methods from the game so it runs its normal methods again."""
+        for method in METHODS:
+            game.__dict__.pop(method, None)
+
+    def _record(self, method, nanoseconds):
+        """Counts a call to method that took the given number of nanoseconds."""
+        self.calls[method] += 1
+        self.nanoseconds[method] += nanoseconds
+        self.histograms[method][1 << nanoseconds.bit_length()] += 1
+
+    def snapshot(self, reset=False):
+        """
+        Returns a dictionary of the current counters that can be saved as JSON: "Calls", "Seconds", and "Histograms"
+        (bucket upper bound in nanoseconds to number of calls) for each method, "Rent Transferred", "GO Bonuses",
+        "GO Bonus Amount", "Purchases", "Purchase Amount", and "Bankruptcies Per Round".  If reset is True, the
+        counters are set back to zero afterwards (for periodic scraping).
+        """
+        snapshot = {
+            "Calls": {method: self.calls[method] for method in METHODS},
+            "Seconds": {method: self.nanoseconds[method] / 1e9 for method in METHODS},
+            "Histograms": {method: dict(sorted(self.histograms[method].items())) for method in METHODS},
+            "Rent Transferred": self.rent_transferred,
+            "GO Bonuses": self.go_bonuses,
+            "GO Bonus Amount": self.go_bonus_amount,
+            "Purchases": self.purchases,
+            "Purchase Amount": self.purchase_amount,
+            "Bankruptcies Per Round": dict(sorted(self.bankruptcies.items())),
+        }
+        if reset:
+            self.reset()
+        return snapshot
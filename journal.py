@@ -0,0 +1,164 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class GameJournal, an append-only binary journal of a RealEstateGame, and functions to read
+#              and replay journals.  The journal starts with a header holding the game state, followed by fixed-width
+#              records of four 64-bit integers (event, player number, space, amount) for each move, purchase, rent
+#              payment, GO bonus, bankruptcy, and set_balance or set_position call.  Snapshots of the game state are
+#              optionally written to a separate stream every few turns so that replaying to a late turn does not
+#              have to start from the first turn.
+import json
+import struct
+import sys
+from array import array
+from RealEstateGame import RealEstateGame, MOVE, BUY, RENT, GO_BONUS, BANKRUPT, SET_BALANCE, SET_POSITION
+
+MAGIC = b"REGJ"
+VERSION = 1
+
+# Header: magic, version, length of the JSON game state that follows
+HEADER = struct.Struct("<4sHI")
+
+# Record: event, player number, space, amount as little-endian 64-bit integers.  For MOVE the space is the starting
+# position and the amount is the number rolled.  For BANKRUPT the space is the player number of the owner who was
+# paid.
+RECORD_FIELDS = 4
+RECORD_SIZE = 8 * RECORD_FIELDS
+
+EVENT_NAMES = {MOVE: "Move", BUY: "Buy", RENT: "Rent", GO_BONUS: "GO Bonus", BANKRUPT: "Bankrupt",
+               SET_BALANCE: "Set Balance", SET_POSITION: "Set Position"}
+
+
+class GameJournal:
+    """
+    A class to represent an append-only journal of a RealEstateGame.  Attach the journal with game.set_journal after
+    all players have been created.  The game appends the four fields of each record directly to the records list
+    (much cheaper than packing each record); they are packed and written to the stream when the buffer is full, or
+    when flush or close is called.
+    """
+    def __init__(self, stream, snapshot_stream=None, snapshot_interval=1000, buffer_records=4096):
+        """
+        Creates a GameJournal that writes to the binary stream.  If snapshot_stream, a text stream, is given, the
+        game state is written to it as a line of JSON at the first flush after every snapshot_interval moves.
+        Records are buffered in memory until buffer_records records are waiting.
+        """
+        self.records = []
+        self.ids = {}                                           # Player name to player number
+        self.limit = buffer_records * RECORD_FIELDS
+        self._stream = stream
+        self._snapshot_stream = snapshot_stream
+        self._snapshot_interval = snapshot_interval
+        self._game = None
+        self._offset = 0                                        # Stream offset of the first buffered record
+        self._moves = 0                                         # Moves written to the stream
+        self._last_snapshot = 0
+
+    def start(self, game):
+        """
+        Called by game.set_journal.  Writes the header with the current state of the game.
+        """
+        state = game.get_state()
+        data = json.dumps(state).encode()
+        self._stream.write(HEADER.pack(MAGIC, VERSION, len(data)) + data)
+        self._offset = HEADER.size + len(data)
+        self._game = game
+        self.ids = {player[0]: number for number, player in enumerate(state["Players"])}
+
+    def flush(self):
+        """
+        Writes the buffered records to the stream.  The game calls flush between turns, so a snapshot is written
+        here if snapshot_interval moves have been recorded since the last one.
+        """
+        records = self.records
+        self._stream.write(struct.pack("<%dq" % len(records), *records))
+        self._offset += len(records) * 8
+        self._moves += records[0::RECORD_FIELDS].count(MOVE)
+        records.clear()
+
+        if self._snapshot_stream is not None and self._moves - self._last_snapshot >= self._snapshot_interval:
+            snapshot = {"Turn": self._moves, "Offset": self._offset, "State": self._game.get_state()}
+            self._snapshot_stream.write(json.dumps(snapshot) + "\n")
+            self._last_snapshot = self._moves
+
+    def close(self):
+        """Writes the buffered records and stops recording the game."""
+        self.flush()
+        if self._game is not None:
+            self._game.set_journal(None)
+            self._game = None
+
+
+def read_header(stream):
+    """
+    Given a binary journal stream at its start, reads the header and returns the game state it holds.  The stream is
+    left at the first record.
+    """
+    magic, version, length = HEADER.unpack(stream.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a Real Estate Game journal.")
+    return json.loads(stream.read(length))
+
+
+def read_records(stream, chunk_records=4096):
+    """
+    Given a binary journal stream positioned at a record, yields (event, player number, space, amount) for each
+    record, reading chunk_records records at a time.
+    """
+    while True:
+        chunk = stream.read(RECORD_SIZE * chunk_records)
+        if len(chunk) < RECORD_SIZE:
+            return
+        records = array("q")
+        records.frombytes(chunk[:len(chunk) - len(chunk) % RECORD_SIZE])
+        if sys.byteorder == "big":
+            records.byteswap()
+        yield from zip(records[0::4], records[1::4], records[2::4], records[3::4])
+
+
+def read_events(stream):
+    """
+    Given a binary journal stream at its start, yields (event name, player name, space, amount) for each record.
+    """
+    names = [player[0] for player in read_header(stream)["Players"]]
+    for event, player, space, amount in read_records(stream):
+        yield EVENT_NAMES[event], names[player], space, amount
+
+
+def replay(stream, snapshot_stream=None, turn=None):
+    """
+    Given a binary journal stream at its start, replays the journal into a new RealEstateGame and returns it.  If turn
+    is given, replay stops after that many moves (including any purchase made on the last move).  If snapshot_stream
+    is given and the journal stream is seekable, replay starts from the latest snapshot at or before turn.
+    """
+    state = read_header(stream)
+    names = [player[0] for player in state["Players"]]
+
+    moves = 0
+    if snapshot_stream is not None and turn is not None:
+        best = None
+        for line in snapshot_stream:
+            snapshot = json.loads(line)
+            if snapshot["Turn"] > turn:
+                break
+            best = snapshot
+        if best is not None:
+            state = best["State"]
+            moves = best["Turn"]
+            stream.seek(best["Offset"])
+
+    game = RealEstateGame(verbose=False)
+    game.set_state(state)
+
+    # Only moves, purchases, and set calls change the game.  Rent, GO bonuses, and bankruptcies follow from moves.
+    for event, player, space, amount in read_records(stream):
+        if event == MOVE:
+            if moves == turn:
+                break
+            moves += 1
+            game.move_player(names[player], amount)
+        elif event == BUY:
+            game.buy_space(names[player])
+        elif event == SET_BALANCE:
+            game.set_balance(names[player], amount)
+        elif event == SET_POSITION:
+            game.set_position(names[player], space)
+    return game
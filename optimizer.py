@@ -0,0 +1,108 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines function optimize_policy, an adaptive search for the best buy policy.  Candidate policies play
+#              the same seeded games against a field of opponents (common random numbers), so they are compared
+#              head-to-head game by game.  Search proceeds in rungs of successive halving: every rung the surviving
+#              candidates play a batch of games, candidates whose paired score is confidently below the leader's are
+#              dropped, the weaker half of the rest is dropped, and the batch size doubles.  Games are only spent on
+#              candidates that are still plausibly best.  grid_search plays a fixed number of games per candidate for
+#              comparison.
+import math
+from collections import namedtuple
+from statistics import NormalDist
+from simulation import simulate_game, player_names, always_buy, ThresholdPolicy
+from tournament import game_seed
+from RealEstateGame import DEFAULT_RENTS
+
+# Result of a policy search.  best is the best candidate, scores maps each candidate's index to its mean score, games
+# maps each candidate's index to the number of games it played, and total_games is the number of games simulated.
+SearchResult = namedtuple("SearchResult", ["best", "scores", "games", "total_games"])
+
+
+def threshold_grid(rent_list=None, reserve_rents=(0, 1, 2, 3)):
+    """
+    Returns a list of ThresholdPolicy candidates: one for each rent tier on the board (buy spaces with at least that
+    rent) and each cash reserve (a number of times the highest rent).
+    """
+    rents = DEFAULT_RENTS if rent_list is None else rent_list
+    return [ThresholdPolicy(min_rent, reserve, rent_list) for min_rent in sorted(set(rents))
+            for reserve in reserve_rents]
+
+
+def play_candidate(policy, game_index, players=2, opponent=always_buy, master_seed=0, **options):
+    """
+    Plays the game with the given index for a candidate policy and returns the candidate's score: 1 for a win, 0 for
+    a loss, or its share of the players' balances if the game has no winner.  The candidate sits in seat
+    game_index % number of players and every other seat uses the opponent policy.  Every candidate plays the same
+    game index with the same seed and seat.
+    """
+    names = player_names(players)
+    seat = game_index % len(names)
+    policies = [opponent] * len(names)
+    policies[seat] = policy
+    result = simulate_game(names, policies, game_seed(master_seed, game_index), **options)
+    if result.winner is not None:
+        return 1.0 if result.winner == names[seat] else 0.0
+    total = sum(result.balances.values())
+    return result.balances[names[seat]] / total if total else 0.0
+
+
+def grid_search(candidates, games=1000, **options):
+    """
+    Plays games games for every candidate and returns a SearchResult with the candidate that has the best mean
+    score.  options are passed to play_candidate.
+    """
+    scores = {}
+    for index, policy in enumerate(candidates):
+        scores[index] = sum(play_candidate(policy, game_index, **options) for game_index in range(games)) / games
+    best = max(scores, key=scores.get)
+    return SearchResult(candidates[best], scores, dict.fromkeys(scores, games), games * len(candidates))
+
+
+def optimize_policy(candidates, batch_size=50, max_games=2000, confidence=0.99, **options):
+    """
+    Searches the list of candidate buy policies and returns a SearchResult.  Surviving candidates play batch_size
+    games in the first rung, twice as many in the next, and so on, until one candidate is left or every survivor has
+    played max_games games.  After each rung, a candidate is dropped if the upper confidence bound (at the given
+    confidence) of its mean paired score difference with the leader is below zero, and then the weaker half of the
+    survivors is dropped.  options are passed to play_candidate.
+    """
+    z = NormalDist().inv_cdf(confidence)
+    results = [[] for _ in candidates]                          # Candidate index to scores of games 0, 1, 2, ...
+    alive = list(range(len(candidates)))
+    played = 0
+    batch = batch_size
+    total_games = 0
+    while len(alive) > 1 and played < max_games:
+        batch = min(batch, max_games - played)
+        for index in alive:
+            results[index].extend(play_candidate(candidates[index], game_index, **options)
+                                  for game_index in range(played, played + batch))
+        total_games += batch * len(alive)
+        played += batch
+        batch *= 2
+
+        means = {index: sum(results[index]) / played for index in alive}
+        leader = max(alive, key=means.get)
+        alive = [index for index in alive
+                 if index == leader or _upper_bound(results[index], results[leader], z) >= 0]
+        # Successive halving: keep the better half of the candidates that are still plausibly best.
+        alive.sort(key=means.get, reverse=True)
+        alive = alive[:max(1, math.ceil(len(alive) / 2))] if len(alive) > 2 else alive
+
+    scores = {index: sum(games) / len(games) for index, games in enumerate(results) if games}
+    best = max(alive, key=scores.get) if scores else alive[0]
+    return SearchResult(candidates[best], scores, {index: len(games) for index, games in enumerate(results)},
+                        total_games)
+
+
+def _upper_bound(scores, leader_scores, z):
+    """
+    Given two lists of scores of the same games, returns the upper confidence bound of the mean difference
+    scores - leader_scores.
+    """
+    count = len(scores)
+    differences = [score - leader for score, leader in zip(scores, leader_scores)]
+    mean = sum(differences) / count
+    variance = sum((difference - mean) ** 2 for difference in differences) / (count - 1) if count > 1 else 0.0
+    return mean + z * math.sqrt(variance / count)
@@ -0,0 +1,271 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class ResultsWriter, which streams per-game simulation results into a fixed-width columnar
+#              file, and class ResultsReader, which computes win rates, game length histograms, and property ownership
+#              frequencies over the file one chunk at a time.  The file is a header followed by chunks of chunk_rows
+#              games.  Each chunk stores one column after another: seed, final balance of each player, config id,
+#              rounds, winner, outcome, and the final owner of each space.  Chunks are written and read through mmap,
+#              so memory use does not grow with the number of games.
+import mmap
+import struct
+from array import array
+from collections import Counter
+from tournament import game_seed
+from RealEstateGame import RealEstateGame
+from simulation import play_game, player_names, OUTCOMES
+
+MAGIC = b"RERS"
+VERSION = 3
+
+# Header: magic, version, number of players, number of spaces, rows per chunk, number of games, header size, and chunk
+# size in bytes.  The writer makes the header and each chunk a multiple of its mmap allocation granularity
+# (HEADER_SIZE) so that chunks start on mmap offsets.  Readers use the sizes recorded in the header, so files can be
+# read on hosts with a different granularity.
+HEADER = struct.Struct("<4sHHIIQIQ")
+HEADER_SIZE = mmap.ALLOCATIONGRANULARITY
+
+# Column type codes for the array module, in the order they are stored.  Winners and owners are player numbers, or
+# -1 for no winner or no owner.
+SEED = "Q"
+BALANCE = "q"
+CONFIG = "I"
+ROUNDS = "I"
+WINNER = "b"
+OUTCOME = "b"
+OWNER = "b"
+MAX_PLAYERS = 127
+
+
+def _column_layout(num_players, num_spaces, chunk_rows, alignment=1):
+    """
+    Returns the list of (column name, type code, byte offset in the chunk) and the number of bytes of one chunk,
+    rounded up to a multiple of alignment.
+    """
+    columns = [("Seed", SEED)] + [("Balance " + str(player), BALANCE) for player in range(num_players)] + \
+        [("Config", CONFIG), ("Rounds", ROUNDS), ("Winner", WINNER), ("Outcome", OUTCOME)] + \
+        [("Owner " + str(space), OWNER) for space in range(num_spaces)]
+    layout = []
+    offset = 0
+    for name, code in columns:
+        layout.append((name, code, offset))
+        offset += array(code).itemsize * chunk_rows
+    return layout, -(-offset // alignment) * alignment
+
+
+class ResultsWriter:
+    """
+    A class to represent a writer of game results to a columnar results file.  Results are kept in arrays until a
+    chunk is full, then split into columns and copied into the file through mmap.
+    """
+    def __init__(self, path, num_players, num_spaces=25, chunk_rows=65536):
+        """
+        Creates a new results file at path for games of num_players players on a board of num_spaces spaces.  Use
+        num_spaces=0 to leave out space owners.  chunk_rows must be a multiple of 8.  Winners and owners are stored
+        as signed bytes, so there can be at most MAX_PLAYERS players.
+        """
+        if chunk_rows <= 0 or chunk_rows % 8:
+            raise ValueError("chunk_rows must be a positive multiple of 8.")
+        if not 0 < num_players <= MAX_PLAYERS:
+            raise ValueError("num_players must be from 1 to %d." % MAX_PLAYERS)
+        self._num_players = num_players
+        self._num_spaces = num_spaces
+        self._chunk_rows = chunk_rows
+        self._layout, self._chunk_size = _column_layout(num_players, num_spaces, chunk_rows, HEADER_SIZE)
+        self._file = open(path, "w+b")
+        self._rows = 0
+        self._write_header()
+        self._new_chunk()
+
+    def _new_chunk(self):
+        """Starts empty arrays for the next chunk.  Balances and owners are kept row by row."""
+        self._seeds = array(SEED)
+        self._balances = array(BALANCE)
+        self._configs = array(CONFIG)
+        self._rounds = array(ROUNDS)
+        self._winners = array(WINNER)
+        self._outcomes = array(OUTCOME)
+        self._owners = array(OWNER)
+
+    def _write_header(self):
+        """Writes the header with the current number of games."""
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self._num_players, self._num_spaces, self._chunk_rows,
+                                     self._rows, HEADER_SIZE, self._chunk_size).ljust(HEADER_SIZE, b"\0"))
+
+    def append(self, seed, config, winner, rounds, balances, owners=(), outcome=None):
+        """
+        Adds the result of one game: its seed, config id, winner's player number (-1 for no winner), number of rounds,
+        list of final balances by player number, list of final space owners by position (player numbers, -1 for
+        no owner), and outcome (one of simulation.OUTCOMES, stored by index).  If outcome is None, it is WINNER, or
+        ROUND_CAP if there is no winner.
+        """
+        if len(balances) != self._num_players or owners and len(owners) != self._num_spaces:
+            raise ValueError("Expected one balance per player and one owner per space.")
+        if not -1 <= winner < self._num_players or owners and not -1 <= min(owners) <= max(owners) < self._num_players:
+            raise ValueError("Winners and owners must be player numbers or -1.")
+        self._seeds.append(seed)
+        self._balances.extend(balances)
+        self._configs.append(config)
+        self._rounds.append(rounds)
+        self._winners.append(winner)
+        self._outcomes.append(OUTCOMES.index(outcome) if outcome is not None else int(winner == -1))
+        self._owners.extend(owners if owners else [-1] * self._num_spaces)
+        if len(self._seeds) == self._chunk_rows:
+            self._write_chunk()
+
+    def append_game(self, game, names, seed, config, rounds, outcome=None):
+        """
+        Adds the result of a finished RealEstateGame.  names is the list of player names in player number order, and
+        outcome is as returned by simulation.play_game.
+        """
+        numbers = {name: number for number, name in enumerate(names)}
+        numbers[None] = numbers[False] = -1
+        players = game.get_players()
+        winner = game.check_game_over()
+        self.append(seed, config, numbers[winner or None], rounds, [players[name]["Balance"] for name in names],
+                    [numbers[owner] for owner in game.get_owners()[:self._num_spaces]], outcome)
+
+    def _write_chunk(self):
+        """Copies the waiting results into a new chunk at the end of the file through mmap."""
+        count = len(self._seeds)
+        if count == 0:
+            return
+        players, spaces = self._num_players, self._num_spaces
+        columns = [self._seeds] + [self._balances[player::players] for player in range(players)] + \
+            [self._configs, self._rounds, self._winners, self._outcomes] + \
+            [self._owners[space::spaces] for space in range(spaces)]
+        offset = HEADER_SIZE + (self._rows // self._chunk_rows) * self._chunk_size
+        self._file.truncate(offset + self._chunk_size)
+        chunk = mmap.mmap(self._file.fileno(), self._chunk_size, offset=offset)
+        try:
+            for (name, code, start), column in zip(self._layout, columns):
+                data = column.tobytes()
+                chunk[start:start + len(data)] = data
+        finally:
+            chunk.close()
+        self._rows += count
+        self._new_chunk()
+
+    def close(self):
+        """Writes the last, partly filled chunk and the final number of games, and closes the file."""
+        self._write_chunk()
+        self._write_header()
+        self._file.close()
+
+
+class ResultsReader:
+    """
+    A class to represent a reader of a columnar results file.  The whole file is mapped with mmap and every
+    aggregate is computed one chunk at a time directly over the mapped buffer.
+    """
+    def __init__(self, path):
+        """Opens the results file at path.  Raises ValueError if it is not a results file."""
+        self._file = open(path, "rb")
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("Not a results file.")
+        magic, version, self.num_players, self.num_spaces, self._chunk_rows, self._rows, self._header_size, \
+            self._chunk_size = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a results file.")
+        self._layout, size = _column_layout(self.num_players, self.num_spaces, self._chunk_rows)
+        if self._header_size < HEADER.size or self._chunk_size < size:
+            raise ValueError("Not a results file.")
+        self._offsets = {name: (code, offset) for name, code, offset in self._layout}
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._rows else None
+
+    def __len__(self):
+        """Returns the number of games in the file."""
+        return self._rows
+
+    def chunks(self, *names):
+        """
+        For each chunk, yields a list of memoryviews over the mapped buffer, one for each named column (for example
+        "Winner", "Rounds", "Balance 0", "Owner 3"), holding only the games in that chunk.
+        """
+        for first in range(0, self._rows, self._chunk_rows):
+            count = min(self._chunk_rows, self._rows - first)
+            base = self._header_size + (first // self._chunk_rows) * self._chunk_size
+            views = []
+            for name in names:
+                code, offset = self._offsets[name]
+                size = array(code).itemsize
+                start = base + offset
+                views.append(memoryview(self._map)[start:start + count * size].cast(code))
+            yield views
+
+    def win_rates(self):
+        """
+        Returns a dictionary keyed by config id of dictionaries of each player number's share of wins.  The share of
+        games with no winner is keyed by None.
+        """
+        counts = Counter()
+        for configs, winners in self.chunks("Config", "Winner"):
+            counts.update(zip(configs, winners))
+            configs.release()
+            winners.release()
+        games = Counter()
+        for (config, winner), count in counts.items():
+            games[config] += count
+        rates = {}
+        for (config, winner), count in sorted(counts.items()):
+            rates.setdefault(config, {})[None if winner == -1 else winner] = count / games[config]
+        return rates
+
+    def length_histogram(self):
+        """Returns a Counter of the number of games that lasted each number of rounds."""
+        histogram = Counter()
+        for rounds, in self.chunks("Rounds"):
+            histogram.update(rounds)
+            rounds.release()
+        return histogram
+
+    def outcome_counts(self):
+        """Returns a Counter of the number of games with each outcome (see simulation.OUTCOMES)."""
+        counts = Counter()
+        for outcomes, in self.chunks("Outcome"):
+            counts.update(outcomes)
+            outcomes.release()
+        return Counter({OUTCOMES[code]: count for code, count in counts.items()})
+
+    def ownership_frequencies(self):
+        """
+        Returns a list indexed by position of lists indexed by player number of the share of games in which the
+        player owned the space at the end.  Position 0 (GO) has no owners.
+        """
+        counts = [[0] * self.num_players for space in range(self.num_spaces)]
+        names = ["Owner " + str(space) for space in range(self.num_spaces)]
+        for owners in self.chunks(*names):
+            for space, column in enumerate(owners):
+                data = column.tobytes()
+                column.release()
+                for player in range(self.num_players):
+                    counts[space][player] += data.count(bytes((player,)))
+        return [[count / self._rows for count in space] for space in counts] if self._rows else counts
+
+    def close(self):
+        """Closes the file."""
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+def write_simulations(path, num_games, players=4, policy=None, master_seed=0, config=0, chunk_rows=65536,
+                      **options):
+    """
+    Plays num_games headless games with seeds derived from master_seed (see tournament.game_seed) and writes their
+    results to a new results file at path under the given config id.  players, policy, and options are passed to
+    simulation.play_game, so stalemates end games early as in run_tournament.  Returns the number of games written.
+    """
+    # Create the file before playing, so that it exists (with no games) even if num_games is 0.
+    board = RealEstateGame(verbose=False)
+    board.create_spaces(options.get("go_amount"), options.get("rent_list"), options.get("num_spaces"))
+    writer = ResultsWriter(path, len(player_names(players)), len(board.get_owners()), chunk_rows)
+    try:
+        for game_index in range(num_games):
+            seed = game_seed(master_seed, game_index)
+            game, names, winner, rounds, outcome = play_game(players, policy, seed, **options)
+            writer.append_game(game, names, seed, config, rounds, outcome)
+    finally:
+        writer.close()
+    return num_games
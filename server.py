@@ -0,0 +1,296 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class GameServer, an asyncio server that hosts many Real Estate Games at once over a plain TCP
+#              line protocol.  Each game is a GameSession that tracks whose turn it is, ends turns that take longer
+#              than the turn timeout without blocking other games, and records how long each turn took.
+#
+#              Protocol (one command per line, one reply line per command):
+#                NEW <name>,<name>,...   -> GAME <game id> NEXT <name>
+#                ROLL <game id>          -> ROLLED <number> <position> <balance> DECIDE
+#                                           ROLLED <number> <position> <balance> NEXT <name> (or WINNER <name>)
+#                BUY <game id>           -> BOUGHT NEXT <name> (or WINNER <name>)
+#                PASS <game id>          -> PASSED NEXT <name> (or WINNER <name>)
+#                STATE <game id>         -> STATE <JSON game state with "Turn" and "Winner">
+#                STATS <game id>         -> STATS <turns> <p50 ms> <p95 ms> <p99 ms>
+#                QUIT                    -> BYE
+#              Errors are replied as ERROR <message>.  A finished game is removed once a reply has announced its winner
+#              (or after a grace period if no client asks), and the games a client created are abandoned when the
+#              client quits or disconnects.
+import asyncio
+import json
+import time
+from collections import Counter
+from RealEstateGame import RealEstateGame
+from dice import DiceStream
+
+
+def percentile(values, fraction):
+    """Given a sorted list of values and a fraction from 0 to 1, returns the nearest-rank percentile."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def histogram_percentile(counts, fraction):
+    """Given a Counter of values and a fraction from 0 to 1, returns the nearest-rank percentile of the values."""
+    total = sum(counts.values())
+    rank = min(total - 1, int(fraction * total))
+    for value in sorted(counts):
+        rank -= counts[value]
+        if rank < 0:
+            return value
+    return 0.0
+
+
+def latency_bucket(seconds):
+    """Rounds a turn latency to 3 significant digits, so a histogram of latencies stays small."""
+    return float("%.3g" % seconds)
+
+
+class GameSession:
+    """
+    A class to represent one game hosted by the server: the game, the turn order, and the turn timer.
+    """
+    def __init__(self, game_id, names, dice, turn_timeout, loop, on_finished=None, finished_timeout=60.0):
+        """
+        Creates a GameSession for the list of unique player names.  dice is the dice source (see dice.py).  Turns
+        that take longer than turn_timeout seconds are finished by the server (roll if needed, then pass).  If given,
+        on_finished is called with the session finished_timeout seconds after the game has a winner, unless close is
+        called first.
+        """
+        self.game_id = game_id
+        self.game = RealEstateGame(verbose=False)
+        self.game.create_spaces()
+        for name in names:
+            self.game.create_player(name)
+        self.names = names
+        self.turn = 0                                           # Index of the player whose turn it is
+        self.deciding = False                                   # Player has rolled and may buy the space
+        self.winner = None
+        self.latencies = []                                     # Seconds taken by each finished turn
+        self._dice = dice
+        self._turn_timeout = turn_timeout
+        self._loop = loop
+        self._timer = None
+        self._turn_started = 0.0
+        self._on_finished = on_finished
+        self._finished_timeout = finished_timeout
+        self._start_turn()
+
+    def current_player(self):
+        """Returns the name of the player whose turn it is."""
+        return self.names[self.turn]
+
+    def roll(self):
+        """
+        Rolls the die for the current player and moves them.  Returns (number, position, balance, whether the player
+        may buy the space).
+        """
+        name = self.current_player()
+        number = self._dice.roll()
+        self.game.move_player(name, number)
+        position = self.game.get_player_current_position(name)
+        balance = self.game.get_player_account_balance(name)
+        self.deciding = self.game.get_owner(position) is None and balance > self.game.get_purchase_price(position)
+        if not self.deciding:
+            self._end_turn()
+        return number, position, balance, self.deciding
+
+    def decide(self, buy):
+        """Buys the current space if buy is True, then ends the turn."""
+        if buy:
+            self.game.buy_space(self.current_player())
+        self.deciding = False
+        self._end_turn()
+
+    def next_message(self):
+        """Returns "NEXT <name>" or "WINNER <name>" for the game's current state."""
+        if self.winner is not None:
+            return "WINNER " + str(self.winner)
+        return "NEXT " + str(self.current_player())
+
+    def close(self):
+        """Cancels the turn timer (or the timer of a finished game)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _start_turn(self):
+        """Starts the turn timer for the current player."""
+        self._turn_started = time.perf_counter()
+        self._timer = self._loop.call_later(self._turn_timeout, self._timeout)
+
+    def _end_turn(self):
+        """Records the turn latency, checks if the game is over, and passes the turn to the next player with money."""
+        self.latencies.append(time.perf_counter() - self._turn_started)
+        self.close()
+        winner = self.game.check_game_over()
+        if winner:
+            self.winner = winner
+            if self._on_finished is not None:
+                self._timer = self._loop.call_later(self._finished_timeout, self._on_finished, self)
+            return
+        # Players with zero balance have lost the game and are skipped.
+        self.turn = (self.turn + 1) % len(self.names)
+        while self.game.get_player_account_balance(self.names[self.turn]) == 0:
+            self.turn = (self.turn + 1) % len(self.names)
+        self._start_turn()
+
+    def _timeout(self):
+        """Finishes the current player's turn when they take too long: rolls if needed, then passes."""
+        self._timer = None
+        if not self.deciding:
+            self.roll()
+        if self.deciding:
+            self.decide(False)
+
+
+class GameServer:
+    """
+    A class to represent an asyncio server hosting many Real Estate Games.
+    """
+    def __init__(self, turn_timeout=30.0, seed=None, finished_timeout=60.0):
+        """
+        Creates a GameServer.  Turns that take longer than turn_timeout seconds are finished by the server.  seed makes
+        the dice rolls reproducible.  A finished game whose winner no reply has announced is removed after
+        finished_timeout seconds.
+        """
+        self.sessions = {}                                      # Game id to GameSession of games being played
+        self._finished_latencies = Counter()                    # Histogram of turn latencies of removed games
+        self._turn_timeout = turn_timeout
+        self._finished_timeout = finished_timeout
+        self._dice = DiceStream(seed)
+        self._next_id = 1
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8888):
+        """Starts listening on host and port and returns the asyncio server.  Port 0 picks a free port."""
+        self._server = await asyncio.start_server(self.handle_client, host, port)
+        return self._server
+
+    def close(self):
+        """Stops listening and cancels every game's turn timer."""
+        for session in self.sessions.values():
+            session.close()
+        if self._server is not None:
+            self._server.close()
+
+    def remove_session(self, session):
+        """
+        Removes a finished or abandoned game: cancels its turn timer and adds its turn latencies to the histogram of
+        all games.
+        """
+        session.close()
+        if self.sessions.get(session.game_id) is session:
+            del self.sessions[session.game_id]
+            self._finished_latencies.update(map(latency_bucket, session.latencies))
+
+    def latency_percentiles(self, game_id=None):
+        """
+        Returns the number of turns and the 50th, 95th, and 99th percentile turn latencies in seconds for the given
+        game, or for all games (including removed games, to 3 significant digits) if game_id is None.
+        """
+        if game_id is not None:
+            latencies = sorted(self.sessions[game_id].latencies)
+            return len(latencies), percentile(latencies, 0.5), percentile(latencies, 0.95), percentile(latencies, 0.99)
+        counts = self._finished_latencies.copy()
+        for session in self.sessions.values():
+            counts.update(map(latency_bucket, session.latencies))
+        return (sum(counts.values()), histogram_percentile(counts, 0.5), histogram_percentile(counts, 0.95),
+                histogram_percentile(counts, 0.99))
+
+    async def handle_client(self, reader, writer):
+        """
+        Reads commands from a client and writes one reply line per command until QUIT or disconnect.  Games the
+        client created that are still being played are then abandoned.
+        """
+        created = []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = self.handle_command(line.decode().strip(), created)
+                writer.write((reply + "\n").encode())
+                await writer.drain()
+                if reply == "BYE":
+                    break
+        finally:
+            for game_id in created:
+                session = self.sessions.get(game_id)
+                if session is not None:
+                    self.remove_session(session)
+            writer.close()
+
+    def handle_command(self, line, created=None):
+        """
+        Given a command line, carries out the command and returns the reply line.  If given, the id of a game created
+        by NEW is appended to the list created.
+        """
+        command, _, argument = line.partition(" ")
+        command = command.upper()
+        if command == "QUIT":
+            return "BYE"
+        if command == "NEW":
+            names = [name.strip() for name in argument.split(",") if name.strip()]
+            if not names or len(set(names)) != len(names):
+                return "ERROR Player names must be unique."
+            game_id = self._next_id
+            self._next_id += 1
+            session = GameSession(game_id, names, self._dice, self._turn_timeout, asyncio.get_running_loop(),
+                                  self.remove_session, self._finished_timeout)
+            self.sessions[game_id] = session
+            if created is not None:
+                created.append(game_id)
+            return "GAME " + str(game_id) + " " + session.next_message()
+
+        try:
+            session = self.sessions[int(argument)]
+        except (KeyError, ValueError):
+            return "ERROR Invalid game."
+
+        reply = self._session_command(command, session)
+        # Every reply but STATS names the winner of a finished game, so the game is no longer needed.
+        if session.winner is not None and command != "STATS":
+            self.remove_session(session)
+        return reply
+
+    def _session_command(self, command, session):
+        """Carries out a command for an existing game session and returns the reply line."""
+        if command == "STATE":
+            state = session.game.get_state()
+            state["Turn"] = session.current_player()
+            state["Winner"] = session.winner
+            return "STATE " + json.dumps(state)
+        if command == "STATS":
+            turns, p50, p95, p99 = self.latency_percentiles(session.game_id)
+            return "STATS %d %.3f %.3f %.3f" % (turns, p50 * 1000, p95 * 1000, p99 * 1000)
+        if session.winner is not None:
+            return "ERROR Game over. " + session.next_message()
+        if command == "ROLL":
+            if session.deciding:
+                return "ERROR Buy or pass first."
+            number, position, balance, deciding = session.roll()
+            reply = "ROLLED %d %d %d " % (number, position, balance)
+            return reply + ("DECIDE" if deciding else session.next_message())
+        if command in ("BUY", "PASS"):
+            if not session.deciding:
+                return "ERROR Roll first."
+            session.decide(command == "BUY")
+            return ("BOUGHT " if command == "BUY" else "PASSED ") + session.next_message()
+        return "ERROR Unknown command."
+
+
+async def main(host="127.0.0.1", port=8888):
+    """Runs a GameServer until interrupted."""
+    server = GameServer()
+    await server.start(host, port)
+    print("Real Estate Game server listening on " + host + ":" + str(port))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
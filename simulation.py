@@ -0,0 +1,170 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines function simulate_game which plays complete Real Estate Games without printing, sleeping, or
+#              asking for input, so that many automated games can be played quickly.  Buy decisions are made by
+#              pluggable buy policies.  Each game returns a GameResult with the winner, number of rounds, final
+#              balances, number of properties owned by each player, and how the game ended.
+from collections import namedtuple
+from RealEstateGame import RealEstateGame, DEFAULT_RENTS
+from dice import DiceStream
+from stalemate import StalemateDetector, STABLE, FROZEN, STALLED
+
+# Game outcomes other than the stalemates of stalemate.py
+WINNER = "Winner"
+ROUND_CAP = "Round Cap"
+OUTCOMES = (WINNER, ROUND_CAP, STABLE, FROZEN, STALLED)
+
+# Result of a simulated game. winner is None if the round limit was reached or a stalemate was found before the game
+# was over.  balances and property_counts are dictionaries keyed by player name in seating order.  outcome is WINNER,
+# ROUND_CAP, or one of the stalemates of stalemate.py.
+GameResult = namedtuple("GameResult", ["winner", "rounds", "balances", "property_counts", "outcome"])
+
+
+def always_buy(game, name, position):
+    """Buy policy that tries to buy every unowned space the player lands on (the computer opponent's strategy)."""
+    return True
+
+
+def never_buy(game, name, position):
+    """Buy policy that never buys a space."""
+    return False
+
+
+def reserve_policy(reserve):
+    """
+    Given parameter reserve, an amount of money, returns a buy policy that only buys a space if the player keeps at
+    least the reserve amount after paying the purchase price.
+    """
+    def policy(game, name, position):
+        return game.get_player_account_balance(name) - game.get_purchase_price(position) >= reserve
+    return policy
+
+
+class ThresholdPolicy:
+    """
+    Buy policy that buys a space only if its rent is at least min_rent and the player keeps at least reserve_rents
+    times the highest rent on the board after paying the purchase price.  The highest rent is taken from rent_list
+    (default rents if None).  Unlike reserve_policy, threshold policies can be pickled for run_tournament.
+    """
+    def __init__(self, min_rent=0, reserve_rents=0, rent_list=None):
+        """Creates a ThresholdPolicy."""
+        self.min_rent = min_rent
+        self.reserve_rents = reserve_rents
+        self.reserve = reserve_rents * max(DEFAULT_RENTS if rent_list is None else rent_list)
+
+    def __call__(self, game, name, position):
+        """Returns True if the named player should buy the space at position."""
+        return game.get_rent(position) >= self.min_rent and \
+            game.get_player_account_balance(name) - game.get_purchase_price(position) >= self.reserve
+
+    def __repr__(self):
+        """Returns the policy's name, for example ThresholdPolicy(min_rent=100, reserve_rents=1)."""
+        return "ThresholdPolicy(min_rent=%d, reserve_rents=%g)" % (self.min_rent, self.reserve_rents)
+
+
+def player_names(players):
+    """
+    Given parameter players, either a number of players or a list of unique player names, returns the list of player
+    names.  Numbered players are named "Player 1", "Player 2", ...
+    """
+    if isinstance(players, int):
+        return ["Player " + str(i + 1) for i in range(players)]
+    return list(players)
+
+
+def play_rounds(game, names, policies, dice, max_rounds, first_seat=0, detector=None):
+    """
+    Plays rounds of the given game until check_game_over returns a winner or max_rounds rounds have been played.
+    names is the list of player names in turn order, policies the buy policy of each player, and dice the dice source
+    (see dice.py).  The first round starts with the player at index first_seat.  Play also stops if recorded dice run
+    out, and the unfinished round is not counted, or if the StalemateDetector detector finds a stalemate.  Returns
+    the winner's name (None if there is no winner) and the number of rounds played.
+    """
+    # Local names for the hot loop
+    roll = iter(dice).__next__
+    players_info = game.get_players()
+    owners = game.get_owners()
+    move_player = game.move_player
+    buy_space = game.buy_space
+    seats = [(name, players_info[name], policies[i]) for i, name in enumerate(names)]
+    check_every = detector.interval if detector is not None else 0
+
+    rounds = 0
+    winner = game.check_game_over()
+    try:
+        while not winner and rounds < max_rounds:
+            rounds += 1
+            for name, info, buy in seats[first_seat:]:
+                # Players with zero balance have lost and skip their turn.
+                if info["Balance"] == 0:
+                    continue
+                move_player(name, roll())
+                position = info["Position"]
+                if owners[position] is None and buy(game, name, position):
+                    buy_space(name)
+            first_seat = 0
+            winner = game.check_game_over()
+            if check_every and not rounds % check_every and not winner and detector.check(game, rounds):
+                break
+    except StopIteration:                                       # Recorded dice ran out during a round
+        rounds -= 1
+        winner = game.check_game_over()
+    return winner or None, rounds
+
+
+def play_game(players, policy=None, seed=None, starting_balance=None, go_amount=None, rent_list=None,
+              max_rounds=1000, num_spaces=None, dice=None, stalemates=True, stall_rounds=None):
+    """
+    Plays a complete headless game with the same parameters as simulate_game and returns the finished game, the list
+    of player names, the winner's name (None if there is no winner), the number of rounds, and the outcome (WINNER,
+    ROUND_CAP, or one of the stalemates of stalemate.py).  Stalemates end the game early as in simulate_game.
+    """
+    names = player_names(players)
+    if policy is None:
+        policy = always_buy
+    if callable(policy):
+        policies = [policy] * len(names)
+    else:
+        policies = list(policy)
+        if len(policies) != len(names):
+            raise ValueError("Expected one buy policy per player.")
+
+    # Set up a silent game.
+    game = RealEstateGame(verbose=False)
+    game.create_spaces(go_amount, rent_list, num_spaces)
+    for name in names:
+        if not game.create_player(name, starting_balance):
+            raise ValueError("Player names must be unique.")
+
+    if dice is None:
+        dice = DiceStream(seed)
+    detector = StalemateDetector(stall_rounds) if stalemates else None
+    winner, rounds = play_rounds(game, names, policies, dice, max_rounds, detector=detector)
+    if winner is not None:
+        outcome = WINNER
+    elif detector is not None and detector.outcome is not None:
+        outcome = detector.outcome
+    else:
+        outcome = ROUND_CAP
+    return game, names, winner, rounds, outcome
+
+
+def simulate_game(players, policy=None, seed=None, starting_balance=None, go_amount=None, rent_list=None,
+                  max_rounds=1000, num_spaces=None, dice=None, stalemates=True, stall_rounds=None):
+    """
+    Plays a complete headless game until check_game_over returns a winner or max_rounds rounds have been played.
+    Given parameter players, a number of players or a list of unique names, and parameter policy, a buy policy or a
+    list of buy policies (one per player), simulate_game returns a GameResult.  A buy policy is called as
+    policy(game, name, position) when a player lands on an unowned space and returns True to buy the space.  The
+    default policy is always_buy.  dice is the dice source (see dice.py).  The default is a DiceStream seeded with
+    seed, so seed makes the dice rolls reproducible.  starting_balance, go_amount, rent_list, and num_spaces are
+    passed to create_player and create_spaces.  If stalemates is True, games that provably can never end are
+    stopped early (see stalemate.py), and if stall_rounds is also given, so are games whose ownership has not changed
+    for stall_rounds rounds while no player is expected to lose money.
+    """
+    game, names, winner, rounds, outcome = play_game(players, policy, seed, starting_balance, go_amount, rent_list,
+                                                     max_rounds, num_spaces, dice, stalemates, stall_rounds)
+    players_info = game.get_players()
+    balances = {name: players_info[name]["Balance"] for name in names}
+    property_counts = {name: len(players_info[name]["Properties"]) for name in names}
+    return GameResult(winner, rounds, balances, property_counts, outcome)
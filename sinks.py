@@ -0,0 +1,73 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines message sinks for game messages.  RealEstateGame sends its messages (GO bonus, bankruptcy, and
+#              zero balance) to a sink instead of printing them.  PrintSink prints messages for the interactive game,
+#              NullSink discards them, BufferedSink keeps them in memory, and JsonlSink writes them to a stream as
+#              lines of JSON in batches.
+import json
+
+
+class NullSink:
+    """
+    A sink that discards all messages.  A game given a NullSink skips sending messages entirely.
+    """
+    def emit(self, event, message, **fields):
+        """Discards the message."""
+        return
+
+
+class PrintSink:
+    """
+    A sink that prints each message (the interactive game's behaviour).
+    """
+    def emit(self, event, message, **fields):
+        """Prints the message."""
+        print(message)
+
+
+class BufferedSink:
+    """
+    A sink that keeps every message in memory as a dictionary with "Event", "Message", and the message fields.
+    """
+    def __init__(self):
+        """Creates a BufferedSink with an empty list of messages."""
+        self.messages = []
+
+    def emit(self, event, message, **fields):
+        """Adds the message to the list of messages."""
+        fields["Event"] = event
+        fields["Message"] = message
+        self.messages.append(fields)
+
+    def clear(self):
+        """Removes all messages."""
+        self.messages = []
+
+
+class JsonlSink:
+    """
+    A sink that writes each message to a text stream as a line of JSON, batch_size messages at a time.
+    """
+    def __init__(self, stream, batch_size=1000):
+        """Creates a JsonlSink that writes to the text stream."""
+        self._stream = stream
+        self._batch_size = batch_size
+        self._batch = []
+
+    def emit(self, event, message, **fields):
+        """Adds the message to the batch and writes the batch if it is full."""
+        fields["Event"] = event
+        fields["Message"] = message
+        self._batch.append(fields)
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the waiting messages to the stream."""
+        if self._batch:
+            self._stream.write("".join(json.dumps(fields) + "\n" for fields in self._batch))
+            self._batch = []
+
+    def close(self):
+        """Writes the waiting messages."""
+        self.flush()
@@ -0,0 +1,205 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class ExpectimaxSolver, which computes exact win probabilities and optimal buy decisions for
+#              small Real Estate Games (2-3 players, small balances or small boards).  The solver searches the game
+#              tree of die rolls (chance nodes, each roll with probability 1/6) and buy decisions (each player
+#              maximizes their own chance of winning) up to a horizon of turns.  Chance node values are memoized in a
+#              bounded transposition table keyed by a canonical encoding of the state and evicted least recently used
+#              first.  Win probabilities are the chances of winning within the horizon.
+import time
+from collections import OrderedDict
+
+NO_OWNER = -1
+
+
+class ExpectimaxSolver:
+    """
+    A class to represent an exact expectimax solver for small Real Estate Games.  States are (turn, positions,
+    balances, owners) where turn is the player number about to roll, positions and balances are tuples by player
+    number, and owners is a tuple by space number of player numbers (NO_OWNER for no owner, and for GO).
+    """
+    def __init__(self, horizon=10, max_table_size=1000000):
+        """
+        Creates an ExpectimaxSolver that looks horizon turns ahead.  The transposition table holds at most
+        max_table_size chance node values.
+        """
+        self._horizon = horizon
+        self._max_table_size = max_table_size
+        self._table = OrderedDict()                              # Canonical state key to win probabilities
+        self._board = None
+        self.nodes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.search_time = 0.0
+
+    def __call__(self, game, name, position):
+        """Buy policy interface.  Returns True if buying the space gives the named player the best chance to win."""
+        return self.decide(game, name)[0]
+
+    def nodes_per_second(self):
+        """Returns the average number of nodes searched per second."""
+        return self.nodes / self.search_time if self.search_time else 0.0
+
+    def hit_rate(self):
+        """Returns the share of chance node lookups that were found in the transposition table."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def solve(self, game, name):
+        """
+        Given a game and the name of the player about to roll, returns a dictionary of each player's probability of
+        winning within the horizon when every player buys optimally.
+        """
+        names, state = self._load(game)
+        start = time.perf_counter()
+        try:
+            value = self._chance(names.index(name), *state[1:], self._horizon)
+        finally:
+            self.search_time += time.perf_counter() - start
+        return dict(zip(names, value))
+
+    def decide(self, game, name):
+        """
+        Given a game and the name of the player who has just landed on a space, returns True if buying the space
+        gives the player the best chance of winning, and a dictionary of each player's probability of winning
+        within the horizon after the best decision.
+        """
+        names, (turn, positions, balances, owners) = self._load(game)
+        player = names.index(name)
+        position = positions[player]
+        start = time.perf_counter()
+        try:
+            passed = self._next(player, positions, balances, owners, self._horizon)
+            buy = False
+            if owners[position] == NO_OWNER and position != 0 and balances[player] > self._board[1][position]:
+                bought = self._next(player, positions, *self._buy(player, position, balances, owners), self._horizon)
+                buy = bought[player] >= passed[player]
+                if buy:
+                    passed = bought
+        finally:
+            self.search_time += time.perf_counter() - start
+        return buy, dict(zip(names, passed))
+
+    def clear(self):
+        """Empties the transposition table."""
+        self._table.clear()
+
+    def _load(self, game):
+        """
+        Returns the list of player names in player number order and the canonical state of the game (with turn 0).
+        Clears the transposition table if the board has changed.
+        """
+        board = game.get_board()
+        board = (len(board.names), board.prices, board.rents, board.bonus)
+        if board != self._board:
+            self._board = board
+            self._table.clear()
+        players = game.get_players()
+        names = list(players)
+        numbers = {name: number for number, name in enumerate(names)}
+        owners = tuple(numbers.get(owner, NO_OWNER) for owner in game.get_owners())
+        positions = tuple(info["Position"] if info["Balance"] != 0 else 0 for info in players.values())
+        balances = tuple(info["Balance"] for info in players.values())
+        return names, (0, positions, balances, owners)
+
+    def _chance(self, turn, positions, balances, owners, depth):
+        """
+        Returns the win probabilities of the state where player turn is about to roll with depth turns left.  Values
+        are memoized in the transposition table.
+        """
+        key = (turn, positions, balances, owners, depth)
+        table = self._table
+        value = table.get(key)
+        if value is not None:
+            self.hits += 1
+            table.move_to_end(key)
+            return value
+        self.misses += 1
+        self.nodes += 1
+
+        totals = [0.0] * len(balances)
+        for number in range(1, 7):
+            for player, probability in enumerate(self._roll(turn, positions, balances, owners, depth, number)):
+                totals[player] += probability
+        value = tuple(total / 6 for total in totals)
+
+        table[key] = value
+        if len(table) > self._max_table_size:
+            table.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def _roll(self, turn, positions, balances, owners, depth, number):
+        """
+        Returns the win probabilities after player turn rolls number, choosing the better of buying or passing if
+        they land on a space they can buy.
+        """
+        self.nodes += 1
+        positions, balances, owners, can_buy = self.move(turn, positions, balances, owners, number)
+        value = self._next(turn, positions, balances, owners, depth)
+        if can_buy:
+            bought = self._next(turn, positions, *self._buy(turn, positions[turn], balances, owners), depth)
+            if bought[turn] >= value[turn]:
+                value = bought
+        return value
+
+    def _next(self, turn, positions, balances, owners, depth):
+        """
+        Returns the win probabilities after player turn's turn has ended: certain if the game is over, zero if the
+        horizon is reached, otherwise the value of the next player with money about to roll.
+        """
+        solvent = [player for player, balance in enumerate(balances) if balance != 0]
+        if len(solvent) == 1:
+            value = [0.0] * len(balances)
+            value[solvent[0]] = 1.0
+            return tuple(value)
+        if depth <= 1 or not solvent:
+            return (0.0,) * len(balances)
+        turn = (turn + 1) % len(balances)
+        while balances[turn] == 0:
+            turn = (turn + 1) % len(balances)
+        return self._chance(turn, positions, balances, owners, depth - 1)
+
+    def move(self, turn, positions, balances, owners, number):
+        """
+        Applies the rules of RealEstateGame.move_player to the state: player turn moves number spaces, collects the
+        GO bonus, and pays rent or goes bankrupt.  Returns the new positions, balances, and owners, and whether the
+        player can buy the space they landed on.  Players with zero balance do not move.
+        """
+        num_spaces, prices, rents, bonus = self._board
+        balance = balances[turn]
+        if balance == 0:
+            return positions, balances, owners, False
+        position = positions[turn] + number
+        if position >= num_spaces:
+            position -= num_spaces
+            balance += bonus
+        positions = positions[:turn] + (position,) + positions[turn + 1:]
+        owner = owners[position]
+        if position == 0:
+            can_buy = False
+        elif owner == NO_OWNER:
+            can_buy = balance > prices[position]
+        elif owner != turn:
+            balances = list(balances)
+            if balance <= rents[position]:
+                # Bankruptcy: the owner is paid everything and the player's spaces lose their owner.
+                balances[owner] += balance
+                balance = 0
+                owners = tuple(NO_OWNER if space_owner == turn else space_owner for space_owner in owners)
+                positions = positions[:turn] + (0,) + positions[turn + 1:]
+            else:
+                balances[owner] += rents[position]
+                balance -= rents[position]
+            balances[turn] = balance
+            return positions, tuple(balances), owners, False
+        else:
+            can_buy = False
+        return positions, balances[:turn] + (balance,) + balances[turn + 1:], owners, can_buy
+
+    def _buy(self, turn, position, balances, owners):
+        """Returns the balances and owners after player turn buys the space at position."""
+        balances = balances[:turn] + (balances[turn] - self._board[1][position],) + balances[turn + 1:]
+        owners = owners[:position] + (turn,) + owners[position + 1:]
+        return balances, owners
@@ -0,0 +1,87 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class StalemateDetector, which recognizes games that can never end, or are unlikely to end,
+#              so that headless simulations can stop them early instead of playing to the round limit.  Proven
+#              stalemates are games where every space is owned and no player can ever go bankrupt (STABLE), and games
+#              where no money can ever change hands (FROZEN).  Optionally, games whose space ownership has not
+#              changed for a number of rounds while every player's expected cash flow is non-negative are reported as
+#              STALLED, which is a heuristic and may end a game that would have been won.
+STABLE = "Stable"
+FROZEN = "Frozen"
+STALLED = "Stalled"
+
+
+class StalemateDetector:
+    """
+    A class to represent a stalemate detector for one game.  Call check(game, rounds) every interval rounds, so a
+    stalemate is found at most interval rounds after it starts.  Checking every round would cost more than a round.
+    """
+    def __init__(self, stall_rounds=None, interval=16):
+        """
+        Creates a StalemateDetector.  If stall_rounds is given, games are also reported as STALLED when ownership has
+        not changed for stall_rounds rounds and every player's expected cash flow per turn is non-negative.
+        """
+        self.outcome = None
+        self.interval = interval
+        self._stall_rounds = stall_rounds
+        self._ownership = None                                  # Unowned spaces and rent of each player
+        self._opponent_rents = []                               # Rent of each player's opponents' spaces
+        self._proven = False                                    # Whether ownership allows a proven stalemate
+        self._changed = 0                                       # Round when ownership last changed
+
+    def check(self, game, rounds):
+        """
+        Called after round number rounds of the game.  Returns STABLE, FROZEN, or STALLED if the game should end,
+        otherwise None.  The outcome is also kept in the outcome attribute.
+        """
+        owners = game.get_owners()
+        bonus = game.get_board().bonus
+        unowned = owners.count(None)
+        if unowned and bonus and self._stall_rounds is None:
+            return None
+
+        players = game.get_players()
+        rents = tuple(map(game.get_total_rent, players))
+        ownership = (unowned, rents)
+        if ownership != self._ownership:
+            self._ownership = ownership
+            self._changed = rounds
+            total = sum(rents)
+            self._opponent_rents = [total - rent for rent in rents]
+            self._proven = not unowned and bonus >= min(self._opponent_rents) or not bonus and not total
+        if not self._proven and self._stall_rounds is None:
+            return None
+        solvent = [(info["Balance"], rent, opponent_rent)
+                   for info, rent, opponent_rent in zip(players.values(), rents, self._opponent_rents)
+                   if info["Balance"] != 0]
+        if len(solvent) < 2:
+            return None
+
+        if self._proven and not unowned:
+            # No space can be bought, so spaces only change owner by bankruptcy.  Between passes of GO a player lands
+            # on each space at most once, so they pay at most the rent of their opponents' spaces.  A player whose
+            # balance is more than that cannot go bankrupt before GO, and if the GO bonus covers it, they have more
+            # than that again after GO.  If this holds for every player, no one is ever bankrupt.
+            if all(balance > opponent_rent and bonus >= opponent_rent for balance, rent, opponent_rent in solvent):
+                self.outcome = STABLE
+                return STABLE
+        elif self._proven:
+            # No rent and no GO bonus, so balances never change.  If no one can afford an unowned space, nothing
+            # but the positions will ever change.
+            cheapest = min(game.get_purchase_price(position)
+                           for position, owner in enumerate(owners) if owner is None)
+            if all(balance <= cheapest for balance, rent, opponent_rent in solvent):
+                self.outcome = FROZEN
+                return FROZEN
+
+        if self._stall_rounds is not None and rounds - self._changed >= self._stall_rounds:
+            # Landing is uniform over the board in the long run and a turn passes GO with probability 3.5 / number
+            # of spaces, so expected cash flow per turn times the number of spaces is the GO bonus times 3.5, plus
+            # rent from each opponent, minus the rent of the opponents' spaces.
+            opponents = len(solvent) - 1
+            solvent_rent = sum(rent for balance, rent, opponent_rent in solvent)
+            if all(bonus * 3.5 + opponents * rent - (solvent_rent - rent) >= 0
+                   for balance, rent, opponent_rent in solvent):
+                self.outcome = STALLED
+                return STALLED
+        return None
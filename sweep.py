@@ -0,0 +1,352 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines class Sweep, a durable manifest of a long simulation sweep over game configurations, and
+#              functions run_worker and run_sweep, which play the sweep's chunks of seeded games.  The manifest is a
+#              SQLite file holding the sweep's configurations and one row per chunk of games with its status (pending,
+#              leased, or done) and, once done, its statistics.  Workers in several processes, or on several hosts
+#              sharing the file, lease chunks one at a time, so a sweep that is stopped or crashes resumes from the
+#              chunks that are not done.  Game seeds come from tournament.game_seed, so every chunk gives the same
+#              statistics whichever worker plays it and however many times it is played.  The manifest also records
+#              the name of the buy policy, and workers with a different policy cannot join.
+import argparse
+import importlib
+import json
+import os
+import re
+import socket
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from itertools import product
+from simulation import player_names, always_buy, ThresholdPolicy
+from tournament import new_stats, merge_stats, play_shard
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+
+# The manifest uses SQLite's default rollback journal rather than WAL, which does not work on network filesystems.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spec (id INTEGER PRIMARY KEY CHECK (id = 0), spec TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    config INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    stop INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    expires REAL,
+    finished REAL,
+    seconds REAL,
+    stats TEXT
+);
+CREATE INDEX IF NOT EXISTS chunks_status ON chunks (status);
+"""
+
+
+def sweep_configs(**dimensions):
+    """
+    Given lists of values for simulate_game options (for example starting_balance=[500, 1500], go_amount=[50, 100]),
+    returns the list of option dictionaries for every combination of the values.
+    """
+    names = list(dimensions)
+    return [dict(zip(names, values)) for values in product(*dimensions.values())]
+
+
+def policy_name(policy):
+    """
+    Returns the name of a buy policy recorded in a sweep manifest: module.name for functions and classes without a
+    repr of their own (None is simulation.always_buy), the repr of other policy objects (for example
+    ThresholdPolicy(min_rent=100, reserve_rents=1)), and a list of names for a list of policies.
+    """
+    if policy is None:
+        policy = always_buy
+    if isinstance(policy, (list, tuple)):
+        return [policy_name(player_policy) for player_policy in policy]
+    if not hasattr(policy, "__qualname__") and type(policy).__repr__ is not object.__repr__:
+        return repr(policy)
+    named = policy if hasattr(policy, "__qualname__") else type(policy)
+    return named.__module__ + "." + named.__qualname__
+
+
+def policy_from_name(name):
+    """
+    Returns the buy policy with the given policy_name: an importable function, or a ThresholdPolicy (with the
+    default rents).  Raises ValueError for other policies, which must be passed to run_worker.
+    """
+    match = re.fullmatch(r"ThresholdPolicy\(min_rent=(-?\d+), reserve_rents=([-+.\deE]+)\)", str(name))
+    if match:
+        return ThresholdPolicy(int(match.group(1)), float(match.group(2)))
+    if isinstance(name, str) and "." in name:
+        module, _, function = name.rpartition(".")
+        try:
+            policy = getattr(importlib.import_module(module), function)
+        except (ImportError, AttributeError):
+            policy = None
+        if callable(policy) and not isinstance(policy, type):
+            return policy
+    raise ValueError("Cannot rebuild buy policy " + json.dumps(name) + "; pass it to run_worker.")
+
+
+def manifest_spec(path):
+    """
+    Returns the dictionary describing the sweep in the manifest at path ("Configs", "Games Per Config",
+    "Chunk Size", "Players", "Master Seed", and "Policy").  Raises ValueError if the file holds no sweep.
+    """
+    row = None
+    if os.path.exists(path):
+        db = sqlite3.connect(path, timeout=60)
+        try:
+            row = db.execute("SELECT spec FROM spec").fetchone()
+        except sqlite3.Error:
+            pass
+        finally:
+            db.close()
+    if row is None:
+        raise ValueError("No sweep in " + path + ".")
+    return json.loads(row[0])
+
+
+def worker_id():
+    """Returns the name of this worker process: the host name and process id."""
+    return "%s:%d" % (socket.gethostname(), os.getpid())
+
+
+def _holder_exited(worker):
+    """
+    Returns True if worker is a process on this host (as named by worker_id) that is no longer running.  Leases held
+    by other hosts are only given up when they expire.
+    """
+    host, _, pid = worker.rpartition(":")
+    if os.name != "posix" or host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def _load_stats(data):
+    """Returns the statistics dictionary saved as JSON by Sweep.complete."""
+    stats = json.loads(data)
+    merged = new_stats()
+    merged["Games"] = stats["Games"]
+    merged["Wins"].update(stats["Wins"])
+    merged["No Winner"] = stats["No Winner"]
+    merged["Total Rounds"] = stats["Total Rounds"]
+    merged["Rounds"].update({int(rounds): count for rounds, count in stats["Rounds"].items()})
+    return merged
+
+
+class Sweep:
+    """
+    A class to represent the manifest of a simulation sweep.  Every configuration plays games_per_config games in
+    chunks of chunk_size games, with the seeds of run_tournament for the master seed, so a configuration's
+    statistics are the same as run_tournament(games_per_config, players, master_seed=master_seed, **config).
+    """
+    def __init__(self, path, configs=None, games_per_config=1000, chunk_size=1000, players=4, master_seed=0,
+                 lease_seconds=600, policy=None):
+        """
+        Opens the manifest at path.  If the file holds no sweep, creates one for the list of configs (dictionaries of
+        simulate_game options, see sweep_configs) played with the buy policy.  If it does, configs may be None to
+        join the sweep; otherwise raises ValueError unless the sweep is the same.  Either way, raises ValueError if
+        the sweep's buy policy has a different policy_name.  A leased chunk that is not done within lease_seconds is
+        leased again to another worker.
+        """
+        self.path = path
+        self._lease_seconds = lease_seconds
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.executescript(SCHEMA)
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute("SELECT spec FROM spec").fetchone()
+            if configs is not None:
+                spec = json.loads(json.dumps({"Configs": configs, "Games Per Config": games_per_config,
+                                              "Chunk Size": chunk_size, "Players": player_names(players),
+                                              "Master Seed": master_seed, "Policy": policy_name(policy)}))
+            if row is None:
+                if configs is None:
+                    raise ValueError("No sweep in " + path + ".")
+                self._db.execute("INSERT INTO spec VALUES (0, ?)", (json.dumps(spec),))
+                # Chunks go round the configs, so partial results cover every config.
+                self._db.executemany("INSERT INTO chunks (config, start, stop) VALUES (?, ?, ?)",
+                                     ((config, start, min(start + chunk_size, games_per_config))
+                                      for start in range(0, games_per_config, chunk_size)
+                                      for config in range(len(configs))))
+            elif configs is not None and spec != json.loads(row[0]):
+                raise ValueError(path + " holds a different sweep.")
+            else:
+                spec = json.loads(row[0])
+            if spec["Policy"] != policy_name(policy):
+                raise ValueError(path + " holds a sweep with buy policy " + json.dumps(spec["Policy"]) + ".")
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            self._db.close()
+            raise
+        self.configs = spec["Configs"]
+        self.players = spec["Players"]
+        self.master_seed = spec["Master Seed"]
+        self.policy = spec["Policy"]
+        self._started = time.time()
+
+    def lease(self, worker=None):
+        """
+        Leases the next chunk to worker (default worker_id()) and returns (chunk id, config id, first game index,
+        stop game index), or None if every chunk is done or leased.  Pending chunks come first, then chunks whose
+        lease has expired or whose worker process on this host has exited.
+        """
+        worker = worker or worker_id()
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            chunk = self._db.execute("SELECT id, config, start, stop FROM chunks WHERE status = ? ORDER BY id LIMIT 1",
+                                     (PENDING,)).fetchone()
+            if chunk is None:
+                for chunk_id, config, start, stop, holder, expires in self._db.execute(
+                        "SELECT id, config, start, stop, worker, expires FROM chunks WHERE status = ? ORDER BY id",
+                        (LEASED,)).fetchall():
+                    if expires <= now or _holder_exited(holder):
+                        chunk = (chunk_id, config, start, stop)
+                        break
+            if chunk is not None:
+                self._db.execute("UPDATE chunks SET status = ?, worker = ?, expires = ? WHERE id = ?",
+                                 (LEASED, worker, now + self._lease_seconds, chunk[0]))
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return chunk
+
+    def complete(self, chunk_id, stats, seconds):
+        """
+        Records the statistics dictionary of a played chunk and the seconds it took.  Returns False if the chunk was
+        already done (its lease expired and another worker finished it first).
+        """
+        cursor = self._db.execute("UPDATE chunks SET status = ?, finished = ?, seconds = ?, stats = ? "
+                                  "WHERE id = ? AND status != ?",
+                                  (DONE, time.time(), seconds, json.dumps(stats), chunk_id, DONE))
+        return cursor.rowcount == 1
+
+    def progress(self):
+        """
+        Returns a dictionary with the number of "Chunks" and of chunks "Done", "Leased", and "Pending", the number
+        of "Games" and "Games Done", and "Games Per Second" finished by all workers since this Sweep was opened.
+        """
+        progress = {"Chunks": 0, "Done": 0, "Leased": 0, "Pending": 0, "Games": 0, "Games Done": 0}
+        for status, chunks, games in self._db.execute(
+                "SELECT status, COUNT(*), SUM(stop - start) FROM chunks GROUP BY status"):
+            progress[status.capitalize()] = chunks
+            progress["Chunks"] += chunks
+            progress["Games"] += games
+            if status == DONE:
+                progress["Games Done"] = games
+        recent, = self._db.execute("SELECT SUM(stop - start) FROM chunks WHERE status = ? AND finished >= ?",
+                                   (DONE, self._started)).fetchone()
+        elapsed = time.time() - self._started
+        progress["Games Per Second"] = (recent or 0) / elapsed if elapsed > 0 else 0.0
+        return progress
+
+    def results(self):
+        """
+        Returns a list indexed by config id of the merged statistics dictionaries (see tournament.new_stats) of the
+        chunks that are done.  The options of config id i are configs[i].
+        """
+        results = [new_stats() for _ in self.configs]
+        for config, stats in self._db.execute("SELECT config, stats FROM chunks WHERE status = ?", (DONE,)):
+            merge_stats(results[config], _load_stats(stats))
+        return results
+
+    def close(self):
+        """Closes the manifest."""
+        self._db.close()
+
+
+def print_progress(progress):
+    """Prints a line of sweep progress (see Sweep.progress)."""
+    print("Chunks %d/%d (%d leased), games %d/%d, %.0f games/s" %
+          (progress["Done"], progress["Chunks"], progress["Leased"], progress["Games Done"], progress["Games"],
+           progress["Games Per Second"]))
+
+
+def run_worker(path, policy=None, worker=None, progress=None, max_chunks=None):
+    """
+    Joins the sweep in the manifest at path and plays chunks until none are left (or max_chunks chunks have been
+    played).  policy must be the sweep's buy policy (see Sweep).  If progress is given, it is called with
+    Sweep.progress() after each chunk.  Returns the number of chunks played.
+    """
+    sweep = Sweep(path, policy=policy)
+    worker = worker or worker_id()
+    played = 0
+    try:
+        while max_chunks is None or played < max_chunks:
+            chunk = sweep.lease(worker)
+            if chunk is None:
+                break
+            chunk_id, config, start, stop = chunk
+            begin = time.perf_counter()
+            stats = play_shard((start, stop, sweep.master_seed, sweep.players, policy, sweep.configs[config]))
+            sweep.complete(chunk_id, stats, time.perf_counter() - begin)
+            played += 1
+            if progress is not None:
+                progress(sweep.progress())
+    finally:
+        sweep.close()
+    return played
+
+
+def run_sweep(path, configs=None, games_per_config=1000, chunk_size=1000, players=4, policy=None, master_seed=0,
+              workers=None, progress=print_progress, interval=1.0):
+    """
+    Creates the sweep in the manifest at path (or resumes it, or joins it if configs is None), plays every chunk
+    that is not done across worker processes, and returns Sweep.results().  progress is called with
+    Sweep.progress() every interval seconds.  workers defaults to the number of CPUs.  If workers is 1, the chunks
+    are played in this process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    sweep = Sweep(path, configs, games_per_config, chunk_size, players, master_seed, policy=policy)
+    try:
+        if workers == 1:
+            run_worker(path, policy, progress=progress)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(run_worker, path, policy) for _ in range(workers)]
+                waiting = futures
+                while waiting:
+                    waiting = wait(waiting, timeout=interval)[1]
+                    if progress is not None:
+                        progress(sweep.progress())
+                for future in futures:
+                    future.result()
+        return sweep.results()
+    finally:
+        sweep.close()
+
+
+def main():
+    """
+    Joins or resumes the sweep in a manifest file and prints its progress and results.  The buy policy is rebuilt
+    from the name recorded in the manifest unless --policy names another, which is refused if it differs.
+    """
+    parser = argparse.ArgumentParser(description="Real Estate Game simulation sweep worker")
+    parser.add_argument("manifest", help="sweep manifest file")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: number of CPUs)")
+    parser.add_argument("--policy", help="buy policy name, for example simulation.never_buy or "
+                                         "'ThresholdPolicy(min_rent=100, reserve_rents=1)' (default: the sweep's)")
+    args = parser.parse_args()
+
+    try:
+        spec = manifest_spec(args.manifest)
+        policy = policy_from_name(args.policy or spec["Policy"])
+        results = run_sweep(args.manifest, policy=policy, workers=args.workers)
+    except ValueError as error:
+        parser.error(str(error))
+    for config, stats in zip(spec["Configs"], results):
+        print(json.dumps(config), dict(stats["Wins"]), "no winner:", stats["No Winner"])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Author: Katie Booth
+# GitHub username: boothcat
+# Description: Defines function run_tournament which plays many headless Real Estate Games across a pool of worker
+#              processes.  Every game gets its own seed derived from a master seed, so any single game can be re-run
+#              by itself with replay_game.  Workers return small aggregate statistics rather than per-game results.
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from simulation import simulate_game, player_names
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def game_seed(master_seed, game_index):
+    """
+    Given the master seed and the index of a game, returns the 64-bit seed of that game.  The seed is a SplitMix64
+    hash so that neighbouring games get unrelated dice rolls.
+    """
+    z = (master_seed * 0x9E3779B97F4A7C15 + (game_index + 1) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def new_stats():
+    """
+    Returns an empty statistics dictionary: number of games, wins by player name, number of games without a winner,
+    total rounds, and a histogram of the number of rounds per game.
+    """
+    return {"Games": 0, "Wins": Counter(), "No Winner": 0, "Total Rounds": 0, "Rounds": Counter()}
+
+
+def merge_stats(stats, other):
+    """Adds the statistics dictionary other into the statistics dictionary stats and returns stats."""
+    stats["Games"] += other["Games"]
+    stats["Wins"].update(other["Wins"])
+    stats["No Winner"] += other["No Winner"]
+    stats["Total Rounds"] += other["Total Rounds"]
+    stats["Rounds"].update(other["Rounds"])
+    return stats
+
+
+def replay_game(master_seed, game_index, players=4, policy=None, **options):
+    """
+    Re-runs the single game with the given index of a tournament played with master_seed and returns its
+    GameResult.  players, policy, and options must be the same as the ones given to run_tournament.
+    """
+    return simulate_game(players, policy, game_seed(master_seed, game_index), **options)
+
+
+def play_shard(shard):
+    """
+    Worker function.  Given a shard tuple (start, stop, master seed, players, policy, dictionary of simulate_game
+    options), plays the games in range(start, stop) and returns their statistics dictionary.
+    """
+    start, stop, master_seed, players, policy, options = shard
+    stats = new_stats()
+    wins = stats["Wins"]
+    rounds = stats["Rounds"]
+    for game_index in range(start, stop):
+        result = simulate_game(players, policy, game_seed(master_seed, game_index), **options)
+        if result.winner is None:
+            stats["No Winner"] += 1
+        else:
+            wins[result.winner] += 1
+        stats["Total Rounds"] += result.rounds
+        rounds[result.rounds] += 1
+    stats["Games"] = stop - start
+    return stats
+
+
+def run_tournament(num_games, players=4, policy=None, master_seed=0, workers=None, shard_size=None, **options):
+    """
+    Plays num_games headless games split into shards across worker processes and returns the merged statistics
+    dictionary (see new_stats).  players and policy are passed to simulate_game, and must be picklable (buy policies
+    defined at module level).  Options starting_balance, go_amount, rent_list, and max_rounds are also passed to
+    simulate_game.  workers defaults to the number of CPUs.  If workers is 1, the games are played in this process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if shard_size is None:
+        # A few shards per worker balances the load without much inter-process traffic.
+        shard_size = max(1, -(-num_games // (workers * 4)))
+
+    players = player_names(players)
+    shards = [(start, min(start + shard_size, num_games), master_seed, players, policy, options)
+              for start in range(0, num_games, shard_size)]
+
+    stats = new_stats()
+    if workers == 1:
+        for shard in shards:
+            merge_stats(stats, play_shard(shard))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard_stats in executor.map(play_shard, shards):
+            merge_stats(stats, shard_stats)
+    return stats